@@ -1,26 +1,20 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from price_store import load_prices
+from rolling_correlation import rolling_correlation
 
-# Charger le fichier Excel
+# Charger les données (store colonne si disponible, sinon classeur Excel)
 file_path = 'data/resultat_s&p500_trie.xlsx'  # Remplacez par le chemin de votre fichier Excel
-xls = pd.ExcelFile(file_path)
 returns_dict = {}
 price_dict = {}
 
 # Charger les données de rendement pour les tickers choisis
 tickers = ['JPM', 'BAC']
 for ticker in tickers:
-    df = pd.read_excel(xls, sheet_name=ticker)
-    
-    # Convertir la colonne "Date" en datetime et la définir comme index
-    df['date'] = pd.to_datetime(df['date'])
+    # Dates converties et RET nettoyé une fois pour toutes par price_store
+    df = load_prices(ticker, columns=['PRC', 'RET'], workbook=file_path)
     df.set_index('date', inplace=True)
     
-    # Remplacer la virgule par un point dans la colonne 'RET' si nécessaire
-    df['RET'] = df['RET'].astype(str).str.replace(',', '.', regex=False)
-    
-    # Convertir la colonne 'RET' en type numérique
-    df['RET'] = pd.to_numeric(df['RET'], errors='coerce')
     # Supprimer les lignes avec des dates en double pour éviter les erreurs de reindexation
     df = df[~df.index.duplicated(keep='first')]
     
@@ -31,8 +25,9 @@ for ticker in tickers:
 # Paramètres pour la corrélation glissante
 window_size = 90
 
-# Calcul de la corrélation glissante
-rolling_corr = returns_dict['JPM'].rolling(window=window_size).corr(returns_dict['BAC'])
+# Calcul de la corrélation glissante (moteur incrémental : on ne demande que la paire tracée)
+returns_df = pd.DataFrame(returns_dict)
+rolling_corr = rolling_correlation(returns_df, window_size, pairs=[(tickers[0], tickers[1])])[(tickers[0], tickers[1])]
 
 # Tracer l'évolution du coefficient de corrélation et des prix
 fig, ax1 = plt.subplots(figsize=(14, 6))
@@ -1,21 +1,25 @@
+import os
 import numpy as np
 import pandas as pd
-from itertools import product
+from itertools import product, islice, repeat
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from datetime import datetime, timedelta
-from scipy.stats import linregress
+from price_store import load_prices, load_universe_matrix
+from param_search import run_search
+from indicators import ema_series, macd_series, rsi_series
 
 rsi_high = 75
 rsi_low = 40
+# À changer à chaque modification des règles de la stratégie : les résultats enregistrés (result_store) ne sont plus réutilisés
+STRATEGY_VERSION = "macd-rsi-1"
 
-# Charger les données depuis Excel
+# Charger les données (store colonne si disponible, sinon classeur Excel)
 def read_excel(file_path, ticker, start_date):
-    df = pd.read_excel(file_path, sheet_name=ticker)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df[df["date"] >= start_date]
-    df['RET'] = pd.to_numeric(df['RET'].astype(str).str.replace(',', '.', regex=False), errors='coerce')
-    return df
+    return load_prices(ticker, start=start_date, workbook=file_path)
 
-# Calcul des indicateurs techniques
+# Calcul des indicateurs barre par barre (boucle d'origine, référence des versions vectorisées)
 def calculate_sma(prices, N):
     if len(prices) < N:
         return None
@@ -32,26 +36,6 @@ def calculate_rsi(prices, N):
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
-def calculate_volatility(retu, N):
-    if len(retu) < N:
-        return None
-    return np.std(retu[-N:])
-
-def calculate_stochastic_oscillator(prices, N):
-    if len(prices) < N:
-        return None
-    lowest_price = np.min(prices[-N:])
-    highest_price = np.max(prices[-N:])
-    return (prices[-1] - lowest_price) / (highest_price - lowest_price) * 100
-
-def sma_trend(SMA, window):
-    if len(SMA) < window:
-        return None  # Pas assez de données
-    recent_sma = SMA[-window:]
-    x = np.arange(len(recent_sma))
-    slope, _, _, _, _ = linregress(x, recent_sma)
-    return slope
-
 def EMA(previous_ema, price, window):
     multiplier = 2 / (window + 1)
     return price * multiplier + previous_ema * (1 - multiplier)
@@ -122,32 +106,416 @@ def apply_strategy(df, ema_short_window, ema_long_window, rsi_window, window_sig
     
     return cumulative_pnl, nb_trade
 
-def grid_search(file_path, ticker, start_date, ema_short_range, ema_long_range, rsi_range, window_signal_range):
-    df = read_excel(file_path, ticker, start_date)
-    results = []
+# Version vectorisée : indicateurs calculés sur toute la série en une fois (module indicators)
+
+# Cache LRU des séries d'indicateurs, borné par un budget mémoire (en octets)
+class IndicatorCache:
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, compute):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+        self.misses += 1
+        value = compute()
+        arrays = value if isinstance(value, tuple) else (value,)
+        size = sum(a.nbytes for a in arrays)
+        if size > self.max_bytes:
+            return value
+        for a in arrays:
+            a.setflags(write=False)
+        self._data[key] = (value, size)
+        self.nbytes += size
+        # Éviction des séries les moins récemment utilisées
+        while self.nbytes > self.max_bytes:
+            _, (_, old_size) = self._data.popitem(last=False)
+            self.nbytes -= old_size
+        return value
+
+    def __getitem__(self, key):
+        return self._data[key][0]
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return f"Cache indicateurs : {self.hits} hits, {self.misses} misses ({rate:.1f}% hits), {len(self._data)} séries, {self.nbytes / 1024 ** 2:.1f} Mo"
+
+def strategy_indicators(prices, ema_short_window, ema_long_window, rsi_window, window_signal, cache=None, series_id=None):
+    if cache is None:
+        EMA_short = ema_series(prices, ema_short_window)
+        EMA_long = ema_series(prices, ema_long_window)
+        MACD, signal_line = macd_series(EMA_short, EMA_long, window_signal)
+        return MACD, signal_line, rsi_series(prices, rsi_window)
+
+    # Clés (série, indicateur, fenêtre) : chaque série n'est calculée qu'une fois
+    EMA_short = cache.get((series_id, "ema", ema_short_window), lambda: ema_series(prices, ema_short_window))
+    EMA_long = cache.get((series_id, "ema", ema_long_window), lambda: ema_series(prices, ema_long_window))
+    MACD, signal_line = cache.get((series_id, "macd_signal", (ema_short_window, ema_long_window, window_signal)),
+                                  lambda: macd_series(EMA_short, EMA_long, window_signal))
+    rsi = cache.get((series_id, "rsi", rsi_window), lambda: rsi_series(prices, rsi_window))
+    return MACD, signal_line, rsi
+
+def strategy_positions(MACD, signal_line, rsi, ema_short_window, ema_long_window, offset=0):
+    # Mêmes conditions de démarrage que la boucle de apply_strategy
+    # offset : rang dans la série complète de la première ligne (scalaire ou un par colonne), pour des tranches d'indicateurs
+    rows = np.arange(len(MACD)).reshape((-1,) + (1,) * (MACD.ndim - 1))
+    active = (rows + np.asarray(offset)) >= max(ema_short_window, ema_long_window)
+    active = active & ~np.isnan(rsi)
+    with np.errstate(invalid='ignore'):
+        buy = active & (MACD > signal_line) & (rsi < rsi_low)
+        sell = active & (MACD < signal_line) & (rsi > rsi_high)
+
+    # Bascule achat/vente : la position suit le dernier signal émis
+    events = np.where(buy, 1, np.where(sell, -1, 0))
+    rows = np.arange(len(events)).reshape((-1,) + (1,) * (events.ndim - 1))
+    idx = np.where(events != 0, rows, -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    last_event = np.take_along_axis(events, np.maximum(idx, 0), axis=0)
+    return ((idx >= 0) & (last_event == 1)).astype(np.int8)
+
+def apply_strategy_numpy(prices, ema_short_window, ema_long_window, rsi_window, window_signal, cache=None, series_id=None, end=None):
+    # end : backtest limité aux `end` premières barres
+    prices = np.asarray(prices, dtype=float)
+    if end is not None and cache is None:
+        prices, end = prices[:end], None
+    if len(prices) == 0:
+        return 0, 0
+    MACD, signal_line, rsi = strategy_indicators(prices, ema_short_window, ema_long_window, rsi_window, window_signal, cache, series_id)
+    if end is not None:
+        # Indicateurs causaux : ceux d'un préfixe sont le début de ceux de la série complète, déjà en cache
+        prices, MACD, signal_line, rsi = prices[:end], MACD[:end], signal_line[:end], rsi[:end]
+        if len(prices) == 0:
+            return 0, 0
+    position = strategy_positions(MACD, signal_line, rsi, ema_short_window, ema_long_window)
+    changes = np.diff(position, prepend=0)
+    entries = prices[changes == 1]
+    exits = prices[changes == -1]
+
+    # Clôture de la position ouverte au dernier prix
+    if len(exits) < len(entries):
+        exits = np.append(exits, prices[-1])
+    nb_trade = len(entries)
+    if nb_trade == 0:
+        return 0, 0
+    cumulative_pnl = np.cumsum(exits - entries)[-1]
+    return float(cumulative_pnl), nb_trade
+
+def positions_pnl(prices, position):
+    # PnL et nombre de trades par colonne de même longueur, position ouverte clôturée au dernier prix
+    changes = np.diff(position, axis=0, prepend=0)
+    total_buy = np.where(changes == 1, prices, 0).sum(axis=0)
+    total_sell = np.where(changes == -1, prices, 0).sum(axis=0) + np.where(position[-1] == 1, prices[-1], 0)
+    return total_sell - total_buy, (changes == 1).sum(axis=0)
+
+# Noyau par lots : un bloc de combinaisons avance en même temps, une colonne d'état par combinaison
+# (ligne de signal, position, prix d'entrée, PnL), en une seule passe sur le temps. Mêmes résultats que apply_strategy_numpy.
+def batch_backtest(prices, combinations, cache=None, series_id=None, end=None):
+    prices = np.asarray(prices, dtype=float)
+    params = np.asarray(list(combinations), dtype=np.int64).reshape(-1, 4)
+    ema_short, ema_long, rsi_window, window_signal = params.T
+    n = len(prices) if end is None else min(end, len(prices))
+    pnl = np.zeros(len(params))
+    nb_trade = np.zeros(len(params), dtype=np.int64)
+    if n == 0 or len(params) == 0:
+        return pnl, nb_trade
+
+    # Indicateurs sans état propre à la combinaison : une série par fenêtre distincte (cache partagé avec apply_strategy_numpy)
+    def column(indicator, window, compute):
+        if cache is None:
+            return compute(prices[:n], window)
+        return cache.get((series_id, indicator, window), lambda: compute(prices, window))[:n]
+    ema_windows, ema_index = np.unique(np.concatenate([ema_short, ema_long]), return_inverse=True)
+    ema = np.column_stack([column("ema", w, ema_series) for w in ema_windows])
+    rsi_windows, rsi_index = np.unique(rsi_window, return_inverse=True)
+    rsi = np.column_stack([column("rsi", w, rsi_series) for w in rsi_windows])
+    short_index, long_index = ema_index[:len(params)], ema_index[len(params):]
+
+    multiplier = 2 / (window_signal + 1)
+    decay = 1 - multiplier
+    start = np.maximum(ema_short, ema_long)
+    # La ligne de signal démarre sur la première valeur du MACD
+    signal_start = start - 1
+    signal_line = np.full(len(params), np.nan)
+    position = np.zeros(len(params), dtype=bool)
+    entry = np.zeros(len(params))
+
+    with np.errstate(invalid='ignore'):
+        for t in range(max(int(signal_start.min()), 0), n):
+            MACD = ema[t, short_index] - ema[t, long_index]
+            signal_line = np.where(signal_start == t, MACD, multiplier * MACD + decay * signal_line)
+            rsi_t = rsi[t, rsi_index]
+            active = (start <= t) & ~np.isnan(rsi_t)
+            buy = active & (MACD > signal_line) & (rsi_t < rsi_low)
+            sell = active & (MACD < signal_line) & (rsi_t > rsi_high)
+            opened = buy & ~position
+            closed = sell & position
+            if opened.any():
+                entry[opened] = prices[t]
+                nb_trade += opened
+            if closed.any():
+                pnl[closed] += prices[t] - entry[closed]
+            position = (position | buy) & ~sell
+
+    # Clôture des positions ouvertes au dernier prix
+    pnl[position] += prices[n - 1] - entry[position]
+    return pnl, nb_trade
+
+# Mode univers : tous les tickers en une passe sur une matrice (temps x tickers)
+def pack_columns(matrix):
+    # Ramène les prix valides de chaque colonne en haut : chaque ticker garde sa propre chronologie, NaN en fin de colonne
+    valid = ~np.isnan(matrix)
+    order = np.argsort(~valid, axis=0, kind='stable')
+    return np.take_along_axis(matrix, order, axis=0), valid.sum(axis=0)
+
+def backtest_universe(prices, ema_short_window, ema_long_window, rsi_window, window_signal):
+    # prices : DataFrame (dates x tickers), par exemple price_store.load_universe_matrix
+    packed, lengths = pack_columns(prices.to_numpy(dtype=float))
+    MACD, signal_line, rsi = strategy_indicators(packed, ema_short_window, ema_long_window, rsi_window, window_signal)
+    position = strategy_positions(MACD, signal_line, rsi, ema_short_window, ema_long_window)
+    changes = np.diff(position, axis=0, prepend=0)
+
+    columns = np.arange(packed.shape[1])
+    last = np.maximum(lengths - 1, 0)
+    first_price = packed[0]
+    last_price = packed[last, columns]
+    # Position encore ouverte au dernier prix valide : clôturée à ce prix
+    still_open = (position[last, columns] == 1) & (lengths > 0)
+    total_buy = np.where(changes == 1, packed, 0).sum(axis=0)
+    total_sell = np.where(changes == -1, packed, 0).sum(axis=0) + np.where(still_open, last_price, 0)
+    nb_trade = (changes == 1).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = pd.DataFrame({
+            "pnl": total_sell - total_buy,
+            "nb_trade": nb_trade,
+            "return": np.where(total_buy > 0, (total_sell - total_buy) / total_buy * 100, np.nan),
+            "underlying_return": (last_price - first_price) / first_price * 100,
+            "nb_bars": lengths,
+        }, index=prices.columns)
+    return results.sort_values("pnl", ascending=False)
 
+def iter_combinations(ema_short_range, ema_long_range, rsi_range, window_signal_range):
     for ema_short, ema_long, rsi_window, window_signal in product(ema_short_range, ema_long_range, rsi_range, window_signal_range):
         if ema_short >= ema_long:
             continue
-        pnl, nb_trade = apply_strategy(df, ema_short, ema_long, rsi_window, window_signal)
+        yield ema_short, ema_long, rsi_window, window_signal
+
+def iter_chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Prix partagés entre les processus (attachés une seule fois par worker)
+_shared_prices = None
+_shared_block = None
+_worker_cache = None
+
+def _init_worker(shm_name, length, cache_bytes):
+    global _shared_prices, _shared_block, _worker_cache
+    _shared_block = shared_memory.SharedMemory(name=shm_name)
+    _shared_prices = np.ndarray((length,), dtype=np.float64, buffer=_shared_block.buf)
+    _worker_cache = IndicatorCache(cache_bytes) if cache_bytes else None
+
+def _run_chunk(combinations, end=None):
+    hits, misses = (_worker_cache.hits, _worker_cache.misses) if _worker_cache else (0, 0)
+    results = []
+    for ema_short, ema_long, rsi_window, window_signal in combinations:
+        pnl, nb_trade = apply_strategy_numpy(_shared_prices, ema_short, ema_long, rsi_window, window_signal, _worker_cache, end=end)
         results.append((ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade))
-    
+    if _worker_cache:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    return results, hits, misses
+
+def _run_batch_chunk(combinations, end=None):
+    hits, misses = (_worker_cache.hits, _worker_cache.misses) if _worker_cache else (0, 0)
+    pnl, nb_trade = batch_backtest(_shared_prices, combinations, _worker_cache, end=end)
+    results = [(*combination, float(p), int(n)) for combination, p, n in zip(combinations, pnl, nb_trade)]
+    if _worker_cache:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    return results, hits, misses
+
+class BacktestPool:
+    # Processus et mémoire partagée créés une fois, réutilisés pour plusieurs lots de combinaisons
+    # (recherches adaptatives : beaucoup de petits lots successifs)
+    def __init__(self, prices, n_jobs=None, chunk_size=256, cache=None):
+        # Les prix sont copiés une fois en mémoire partagée au lieu d'être picklés à chaque tâche
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.n_jobs = n_jobs if n_jobs and n_jobs > 0 else os.cpu_count()
+        self.chunk_size = chunk_size
+        self.cache = cache
+        cache_bytes = cache.max_bytes if cache is not None else 0
+        self.block = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+        np.ndarray(prices.shape, dtype=np.float64, buffer=self.block.buf)[:] = prices
+        self.executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=(self.block.name, len(prices), cache_bytes))
+
+    def run(self, combinations, end=None):
+        return self.map(_run_chunk, combinations, end)
+
+    def map(self, function, combinations, *args):
+        # function(paquet, *args) -> (résultats, hits, misses), exécutée dans les processus (prix : _shared_prices)
+        combinations = list(combinations)
+        # Petits lots : paquets plus petits pour occuper tous les processus
+        chunk_size = max(1, min(self.chunk_size, -(-len(combinations) // self.n_jobs)))
+        results = []
+        # map conserve l'ordre des paquets : même ordre que la boucle séquentielle
+        for chunk_results, hits, misses in self.executor.map(function, iter_chunks(combinations, chunk_size), *(repeat(a) for a in args)):
+            results.extend(chunk_results)
+            if self.cache is not None:
+                self.cache.hits += hits
+                self.cache.misses += misses
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def parallel_backtests(prices, combinations, n_jobs=None, chunk_size=256, cache=None):
+    with BacktestPool(prices, n_jobs, chunk_size, cache) as pool:
+        return pool.run(combinations)
+
+def grid_search(file_path, ticker, start_date, ema_short_range, ema_long_range, rsi_range, window_signal_range, mode="numpy", n_jobs=1, chunk_size=256, cache=True, search="grid", budget=None, seed=0, store=None):
+    df = read_excel(file_path, ticker, start_date)
+    return sweep(df, ema_short_range, ema_long_range, rsi_range, window_signal_range, mode, n_jobs, chunk_size, cache, ticker, search=search, budget=budget, seed=seed, store=store)
+
+def sweep(df, ema_short_range, ema_long_range, rsi_range, window_signal_range, mode="numpy", n_jobs=1, chunk_size=256, cache=True, series_id=None, verbose=True, search="grid", budget=None, seed=0, store=None):
+    # Balayage sur un DataFrame déjà chargé (colonne PRC), utilisable sans le classeur Excel
+    # mode : "numpy" (apply_strategy_numpy), "batch" (batch_backtest) ou "loop" (apply_strategy, boucle d'origine)
+    # search : "grid" (toutes les combinaisons), "random", "halving" ou "tpe" (param_search, `budget` backtests)
+    # store : result_store.ResultStore ou chemin de la base SQLite ; combinaisons déjà enregistrées relues, nouvelles écrites par paquets
+    prices = df["PRC"].to_numpy(dtype=float)
+    combinations = iter_combinations(ema_short_range, ema_long_range, rsi_range, window_signal_range)
+    if cache is True:
+        cache = IndicatorCache()
+    elif cache is False:
+        cache = None
+    # mode "batch" : toutes les combinaisons d'un lot dans un seul passage (batch_backtest), paquets plus gros en parallèle
+    if mode == "batch":
+        chunk_size = max(chunk_size, 4096)
+    pool = BacktestPool(prices, n_jobs, chunk_size, cache) if mode in ("numpy", "batch") and n_jobs != 1 else None
+    evaluations = 0
+    reused = 0
+    if isinstance(store, str):
+        from result_store import ResultStore
+        store = ResultStore(store)
+        owned_store = store
+    else:
+        owned_store = None
+    if store is not None:
+        from result_store import data_fingerprint
+        # Modes "numpy" et "batch" : résultats identiques, même clé
+        engine = "loop" if mode == "loop" else "numpy"
+        store_key = (str(series_id), data_fingerprint(prices), f"{STRATEGY_VERSION}:{engine}:{rsi_low}-{rsi_high}")
+        known = {}
+        # Paquets écrits au fil du calcul : un balayage interrompu perd au plus un paquet par processus
+        checkpoint = max(chunk_size, 256) * (pool.n_jobs if pool is not None else 1)
+
+    def compute(combinations, end=None):
+        if pool is not None:
+            results = pool.map(_run_batch_chunk, combinations, end) if mode == "batch" else pool.run(combinations, end)
+        elif mode == "batch":
+            combinations = list(combinations)
+            pnl, nb_trade = batch_backtest(prices, combinations, cache, series_id, end)
+            results = [(*combination, float(p), int(n)) for combination, p, n in zip(combinations, pnl, nb_trade)]
+        else:
+            results = []
+            for ema_short, ema_long, rsi_window, window_signal in combinations:
+                if mode == "numpy":
+                    pnl, nb_trade = apply_strategy_numpy(prices, ema_short, ema_long, rsi_window, window_signal, cache, series_id, end)
+                else:
+                    pnl, nb_trade = apply_strategy(df if end is None else df.iloc[:end], ema_short, ema_long, rsi_window, window_signal)
+                results.append((ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade))
+        return results
+
+    def evaluate(combinations, end=None):
+        nonlocal evaluations, reused
+        if store is None:
+            results = compute(combinations, end)
+            evaluations += len(results)
+            return results
+        bars = len(prices) if end is None else min(end, len(prices))
+        if bars not in known:
+            known[bars] = store.lookup(*store_key, bars)
+        saved = known[bars]
+        combinations = list(combinations)
+        missing = [c for c in combinations if tuple(c) not in saved]
+        reused += len(combinations) - len(missing)
+        for chunk in iter_chunks(missing, checkpoint):
+            results = compute(chunk, end)
+            store.save(*store_key, bars, results)
+            saved.update((r[:4], r[4:]) for r in results)
+            evaluations += len(results)
+        return [(*c, *saved[tuple(c)]) for c in combinations]
+
+    try:
+        if search == "grid":
+            results = evaluate(combinations)
+        else:
+            results = run_search(search, combinations, evaluate, budget, len(prices), seed)
+    finally:
+        if pool is not None:
+            pool.close()
+        if owned_store is not None:
+            owned_store.close()
+
+    if verbose and store is not None:
+        print(f"Résultats enregistrés : {reused} combinaisons reprises, {evaluations} calculées")
+    if verbose and search != "grid":
+        print(f"Recherche {search} : {evaluations} backtests, {len(results)} combinaisons évaluées sur toute la période")
+    if verbose and cache is not None and mode in ("numpy", "batch"):
+        print(cache.summary())
+
+    # Tri stable : à PnL égal, l'ordre d'énumération est conservé
     results.sort(key=lambda x: x[4], reverse=True)
     return results
 
-file_path = "../data/resultat_s&p500_trie.xlsx"
-ticker = "AAPL"
-start_date = datetime(2023, 12, 31) - timedelta(days=2 * 365)
-ema_short_range = range(5, 20, 1)
-ema_long_range = range(10, 30, 1)
-rsi_range = range(10, 25, 1)
-window_signal_range = range(5, 15, 1)
-
-optimal_results = grid_search(file_path, ticker, start_date, ema_short_range, ema_long_range, rsi_range, window_signal_range)
-
-if optimal_results:
-    best_ema_short, best_ema_long, best_rsi, best_window_signal, best_pnl, nb_trade = optimal_results[0]
-    print(f"Meilleure combinaison : EMA court = {best_ema_short}, EMA long = {best_ema_long}, RSI = {best_rsi}, Window Signal = {best_window_signal}, PnL = {best_pnl:.2f}€, Nombre de trades = {nb_trade}")
-else:
-    print("Aucune combinaison optimale trouvée.")
+if __name__ == "__main__":
+    file_path = "../data/resultat_s&p500_trie.xlsx"
+    ticker = "AAPL"
+    universe = False  # True : stratégie appliquée à tous les tickers du S&P 500 en une passe
+    start_date = datetime(2023, 12, 31) - timedelta(days=2 * 365)
+    ema_short_range = range(5, 20, 1)
+    ema_long_range = range(10, 30, 1)
+    rsi_range = range(10, 25, 1)
+    window_signal_range = range(5, 15, 1)
+
+    n_jobs = os.cpu_count()  # 1 pour une exécution séquentielle
+    mode = "batch"  # "numpy" : une combinaison à la fois ; "loop" : boucle d'origine (lente)
+    search = "grid"  # "random", "halving" ou "tpe" : recherche adaptative limitée à `budget` backtests
+    budget = 2000
+    store = "../data/sweep_results.sqlite"  # Résultats conservés et réutilisés d'un lancement à l'autre ; None : en mémoire
+
+    if universe:
+        prices = load_universe_matrix(start=start_date, workbook=file_path)
+        universe_results = backtest_universe(prices, 5, 23, 13, 13)
+        print(universe_results.to_string())
+        print(f"PnL total = {universe_results['pnl'].sum():.2f} | Nombre de trades = {universe_results['nb_trade'].sum()}")
+
+    optimal_results = grid_search(file_path, ticker, start_date, ema_short_range, ema_long_range, rsi_range, window_signal_range, mode=mode, n_jobs=n_jobs, search=search, budget=budget, store=store)
+
+    if optimal_results:
+        best_ema_short, best_ema_long, best_rsi, best_window_signal, best_pnl, nb_trade = optimal_results[0]
+        print(f"Meilleure combinaison : EMA court = {best_ema_short}, EMA long = {best_ema_long}, RSI = {best_rsi}, Window Signal = {best_window_signal}, PnL = {best_pnl:.2f}€, Nombre de trades = {nb_trade}")
+    else:
+        print("Aucune combinaison optimale trouvée.")
 
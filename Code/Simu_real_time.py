@@ -1,40 +1,72 @@
+import numpy as np
 import pandas as pd
 import time
 import csv
 from datetime import datetime, timedelta
+from price_store import load_prices
 
 # Chemins des fichiers
 fichier_excel = "data/resultat_s&p500_trie.xlsx"
 fichier_csv = "data/flux_financier.csv"
-ticker = "AAPL"
+tickers = ["AAPL"]
 start_date = datetime(2023, 12, 31) - timedelta(days=2 * 365)  # Date de début
 
-def generer_flux(fichier_excel, fichier_csv):
-    # Lecture du fichier Excel pour le ticker
-    df = pd.read_excel(fichier_excel, sheet_name=ticker)
+# Vitesse de rejeu : secondes de données par seconde réelle
+# 1 = temps réel, 2 * 86400 = un jour de cotation toutes les 0,5 s, None = aussi vite que possible
+speed = 2 * 86400
 
-    # Assurez-vous que la colonne de dates est bien en format datetime
-    if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'])  # Conversion si nécessaire
-    else:
-        raise ValueError("La colonne 'Date' est absente du fichier Excel.")
+def charger_flux(fichier_excel, tickers, start_date):
+    # Tous les tickers entrelacés dans l'ordre chronologique (tri stable : ordre des tickers conservé à date égale)
+    frames = []
+    for ticker in tickers:
+        df = load_prices(ticker, start=start_date, workbook=fichier_excel)
+        if 'TICKER' not in df.columns:
+            df.insert(1, 'TICKER', ticker)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
 
-    # Filtrer les données à partir de la date choisie
-    df = df[df['date'] >= start_date]
+def generer_flux(fichier_excel, fichier_csv, tickers=tickers, start_date=start_date, speed=speed, batch_size=1000, report_every=1.0):
+    df = charger_flux(fichier_excel, tickers, start_date)
+    if df.empty:
+        print("Aucune donnée à rejouer.")
+        return 0, 0.0
 
-    # Création ou écrasement du fichier CSV
-    with open(fichier_csv, mode='w', newline='', encoding='utf-8') as file:
+    # Horaire de publication de chaque ligne, en secondes depuis le début du rejeu
+    seconds = (df['date'] - df['date'].iloc[0]).dt.total_seconds().to_numpy()
+    targets = seconds / speed if speed else np.zeros(len(df))
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    rows = df.values.tolist()
+
+    # Fichier ouvert une seule fois, écritures bufferisées et vidées par paquets
+    with open(fichier_csv, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as file:
         writer = csv.writer(file)
-        # Écrire les en-têtes
         writer.writerow(df.columns)
+        file.flush()
+
+        start = time.perf_counter()
+        last_report = start
+        sent = 0
+        while sent < len(rows):
+            elapsed = time.perf_counter() - start
+            # Toutes les lignes dont l'heure est passée partent dans le même paquet
+            end = min(sent + batch_size, int(np.searchsorted(targets, elapsed, side='right')))
+            if end <= sent:
+                time.sleep(targets[sent] - elapsed)
+                continue
+            writer.writerows(rows[sent:end])
+            file.flush()
+            sent = end
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                print(f"{sent}/{len(rows)} lignes envoyées ({sent / (now - start):.0f} lignes/s)")
+                last_report = now
 
-    # Simuler un flux en temps réel
-    for index, row in df.iterrows():
-        with open(fichier_csv, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(row)
-        print(f"Ligne {index + 1} envoyée : {row.values}")
-        time.sleep(0.5)  # Délai de 1 seconde pour simuler un flux
+    elapsed = time.perf_counter() - start
+    rate = sent / elapsed if elapsed > 0 else float('inf')
+    print(f"Rejeu terminé : {sent} lignes en {elapsed:.2f} s ({rate:.0f} lignes/s)")
+    return sent, elapsed
 
 if __name__ == "__main__":
-    generer_flux(fichier_excel, fichier_csv)
\ No newline at end of file
+    generer_flux(fichier_excel, fichier_csv)
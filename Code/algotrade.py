@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+# Point d'entrée unique en ligne de commande :
+#   python algotrade.py [--headless] backtest|optimize|correlate|scan|replay|live ...
+# Chaque sous-commande importe ses modules au moment de s'exécuter : matplotlib n'est chargé que pour un graphique,
+# yfinance que pour un téléchargement. Les indicateurs (EMA, MACD, RSI) ne dépendent que de numpy : aucun import de scipy.
+# --headless : backend matplotlib "Agg" imposé, aucune fenêtre (serveur, calcul par lots).
+
+DEFAULT_WORKBOOK = "../data/resultat_s&p500_trie.xlsx"
+DEFAULT_CSV = "../data/flux_financier.csv"
+DEFAULT_PARAMS = (5, 23, 13, 13)
+
+def _date(value):
+    return datetime.fromisoformat(value)
+
+def _range(values):
+    # "5 20" ou "5 20 2" -> range(5, 20) / range(5, 20, 2)
+    return range(*values)
+
+def backtest(args):
+    from price_store import list_tickers
+    tickers = args.tickers or list_tickers(workbook=args.workbook)
+    if args.portfolio:
+        from portfolio_backtest import Portfolio, MomentumStrategy, EventEngine, store_streams
+        portfolio = Portfolio(tickers, cash=args.cash, allocation=args.allocation, cost_bps=args.cost_bps, commission=args.commission)
+        engine = EventEngine(MomentumStrategy(len(tickers), *args.params), portfolio)
+        summary = engine.run(store_streams(tickers, args.start, args.end, workbook=args.workbook))
+        for key, value in summary.items():
+            print(f"{key:<18} {value:.2f}" if isinstance(value, float) else f"{key:<18} {value}")
+        return
+
+    import pandas as pd
+    from price_store import load_prices
+    from Momentum_opti import apply_strategy_numpy
+    rows = []
+    for ticker in tickers:
+        prices = load_prices(ticker, start=args.start, end=args.end, columns=["PRC"], workbook=args.workbook)["PRC"].to_numpy(dtype=float)
+        pnl, nb_trade = apply_strategy_numpy(prices, *args.params)
+        rows.append({"ticker": ticker, "pnl": pnl, "nb_trade": nb_trade, "nb_bars": len(prices)})
+    results = pd.DataFrame(rows).sort_values("pnl", ascending=False, kind="stable")
+    print(results.to_string(index=False))
+    if len(results) > 1:
+        print(f"PnL total = {results['pnl'].sum():.2f} | Nombre de trades = {results['nb_trade'].sum()}")
+
+def optimize(args):
+    import Momentum_opti as opti
+    ranges = (_range(args.short), _range(args.long), _range(args.rsi), _range(args.signal))
+    if args.walk_forward:
+        from walk_forward import walk_forward
+        df = opti.read_excel(args.workbook, args.ticker, args.start)
+        results, summary = walk_forward(df, *ranges, args.train_bars, args.test_bars, n_jobs=args.jobs)
+        print(results.to_string())
+        print(f"{summary['folds']} plis : PnL hors échantillon = {summary['oos_pnl_total']:.2f}, "
+              f"{summary['oos_positive_folds_pct']:.0f} % de plis positifs, efficacité walk-forward = {summary['wf_efficiency']:.2f}")
+        return
+
+    results = opti.grid_search(args.workbook, args.ticker, args.start, *ranges, mode=args.mode, n_jobs=args.jobs,
+                               search=args.search, budget=args.budget, seed=args.seed, store=args.store)
+    print(f"{'EMA court':>9} {'EMA long':>9} {'RSI':>5} {'Signal':>7} {'PnL':>12} {'Trades':>7}")
+    for ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade in results[:args.top]:
+        print(f"{ema_short:>9} {ema_long:>9} {rsi_window:>5} {window_signal:>7} {pnl:>12.2f} {nb_trade:>7}")
+
+def correlate(args):
+    from price_store import list_tickers, load_universe_matrix
+    from correlation_pairs import extract_pairs, overlap_matrix, PAIR_COLUMNS
+    tickers = args.tickers or list_tickers(workbook=args.workbook)
+    returns = load_universe_matrix(tickers, args.start, args.end, column="RET", workbook=args.workbook)
+    correlation_matrix = returns.corr()
+    pairs = extract_pairs(correlation_matrix, args.threshold, top_k=args.top_k, overlap=overlap_matrix(returns), min_overlap=args.min_overlap)
+    print(pairs.to_string(index=False))
+
+    if args.output:
+        from workbook_writer import BulkWorkbookWriter
+        with BulkWorkbookWriter(args.output) as writer:
+            writer.write(args.sheet, correlation_matrix)
+        print(f"Matrice de corrélation enregistrée dans {args.output}")
+    if args.charts:
+        # Rendu dans des processus séparés, toujours hors écran (Agg)
+        from pair_charts import render_pair_charts
+        prices = load_universe_matrix(tickers, args.start, args.end, column="PRC", workbook=args.workbook)
+        prices = prices / prices.bfill().iloc[0]
+        os.makedirs(args.charts, exist_ok=True)
+        render_pair_charts(prices, pairs[PAIR_COLUMNS].itertuples(index=False), args.charts)
+
+def scan(args):
+    from extreme_scanner import scan_universe, write_events
+    events, stats = scan_universe(args.tickers or None, args.k_return, args.k_vol, args.tickers_per_chunk, args.years_per_chunk,
+                                  args.start, args.end, workbook=args.workbook)
+    print(f"{len(stats)} tickers, {int(stats['observations'].sum())} barres : {int(events['extreme_return'].sum())} rendements extrêmes, "
+          f"{int(events['extreme_vol'].sum())} volatilités extrêmes")
+    if args.output:
+        write_events(events, args.output)
+        print(f"Table des événements enregistrée dans {args.output}")
+    else:
+        print(events.tail(args.top).to_string(index=False))
+
+def replay(args):
+    from Simu_real_time import generer_flux
+    generer_flux(args.workbook, args.csv, args.tickers, args.start, args.speed or None)
+
+def live(args):
+    import momentum_trade
+    from latency import LatencyProfiler
+    if args.chart:
+        momentum_trade.chart_mode = args.chart
+    try:
+        momentum_trade.traiter_donnees(args.csv, LatencyProfiler(True if args.profile else None), headless=args.headless)
+    except KeyboardInterrupt:
+        pass
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="algotrade", description="Backtests, optimisation, corrélations et flux temps réel")
+    parser.add_argument("--headless", action="store_true", help="aucun backend graphique interactif (serveur)")
+    parser.add_argument("--workbook", default=DEFAULT_WORKBOOK, help="classeur Excel (ou son store colonne à côté)")
+    parser.add_argument("--timing", action="store_true", help="affiche la durée totale de la commande")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def dates(command):
+        command.add_argument("--start", type=_date, default=None, help="AAAA-MM-JJ")
+        command.add_argument("--end", type=_date, default=None, help="AAAA-MM-JJ")
+
+    command = commands.add_parser("backtest", help="stratégie momentum sur un ou plusieurs tickers")
+    command.add_argument("tickers", nargs="*", help="par défaut : tous les tickers du store")
+    command.add_argument("--params", type=int, nargs=4, default=DEFAULT_PARAMS, metavar=("SHORT", "LONG", "RSI", "SIGNAL"))
+    command.add_argument("--portfolio", action="store_true", help="portefeuille événementiel (capital, taille, frais)")
+    command.add_argument("--cash", type=float, default=1_000_000.0)
+    command.add_argument("--allocation", type=float, default=0.02, help="part du capital par position")
+    command.add_argument("--cost-bps", type=float, default=5.0)
+    command.add_argument("--commission", type=float, default=1.0)
+    dates(command)
+    command.set_defaults(func=backtest)
+
+    command = commands.add_parser("optimize", help="recherche des paramètres sur un ticker")
+    command.add_argument("ticker")
+    command.add_argument("--short", type=int, nargs="+", default=[5, 20], metavar="N", help="début fin [pas]")
+    command.add_argument("--long", type=int, nargs="+", default=[10, 30], metavar="N")
+    command.add_argument("--rsi", type=int, nargs="+", default=[10, 25], metavar="N")
+    command.add_argument("--signal", type=int, nargs="+", default=[5, 15], metavar="N")
+    command.add_argument("--mode", choices=("batch", "numpy", "loop"), default="batch")
+    command.add_argument("--search", choices=("grid", "random", "halving", "tpe"), default="grid")
+    command.add_argument("--budget", type=int, default=None, help="nombre de backtests (recherches adaptatives)")
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument("--jobs", type=int, default=os.cpu_count())
+    command.add_argument("--top", type=int, default=20)
+    command.add_argument("--store", default=None, help="base SQLite des résultats (reprise, combinaisons déjà calculées ignorées)")
+    command.add_argument("--walk-forward", action="store_true")
+    command.add_argument("--train-bars", type=int, default=252)
+    command.add_argument("--test-bars", type=int, default=63)
+    command.add_argument("--start", type=_date, default=None, help="AAAA-MM-JJ")
+    command.set_defaults(func=optimize)
+
+    command = commands.add_parser("correlate", help="matrice de corrélation des rendements et paires corrélées")
+    command.add_argument("tickers", nargs="*", help="par défaut : tous les tickers du store")
+    command.add_argument("--threshold", type=float, default=0.7)
+    command.add_argument("--top-k", type=int, default=None)
+    command.add_argument("--min-overlap", type=int, default=0)
+    command.add_argument("--output", default=None, help="classeur Excel de la matrice")
+    command.add_argument("--sheet", default="corr")
+    command.add_argument("--charts", default=None, help="dossier des graphiques des paires")
+    dates(command)
+    command.set_defaults(func=correlate)
+
+    command = commands.add_parser("scan", help="rendements et volatilités de Parkinson extrêmes sur tout l'univers")
+    command.add_argument("tickers", nargs="*", help="par défaut : tous les tickers du store")
+    command.add_argument("--k-return", type=float, default=2.0)
+    command.add_argument("--k-vol", type=float, default=2.0)
+    command.add_argument("--tickers-per-chunk", type=int, default=100)
+    command.add_argument("--years-per-chunk", type=int, default=5, help="0 : tout l'historique d'un bloc de tickers")
+    command.add_argument("--output", default=None, help=".parquet, .csv ou classeur Excel")
+    command.add_argument("--top", type=int, default=20, help="événements affichés sans --output")
+    dates(command)
+    command.set_defaults(func=scan)
+
+    command = commands.add_parser("replay", help="rejeu de l'historique dans le CSV du flux temps réel")
+    command.add_argument("tickers", nargs="*", default=["AAPL"])
+    command.add_argument("--csv", default=DEFAULT_CSV)
+    command.add_argument("--speed", type=float, default=2 * 86400, help="secondes de données par seconde réelle (0 : sans attente)")
+    command.add_argument("--start", type=_date, default=datetime(2022, 1, 1), help="AAAA-MM-JJ")
+    command.set_defaults(func=replay)
+
+    command = commands.add_parser("live", help="stratégie temps réel sur le CSV du flux")
+    command.add_argument("--csv", default=DEFAULT_CSV)
+    command.add_argument("--chart", choices=("blit", "full"), default=None)
+    command.add_argument("--profile", action="store_true", help="mesure des latences par étape")
+    command.set_defaults(func=live)
+    return parser
+
+def main(argv=None):
+    start = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    if args.headless:
+        # Avant tout import de matplotlib, y compris dans les processus de calcul
+        os.environ["MPLBACKEND"] = "Agg"
+    args.func(args)
+    if args.timing:
+        print(f"{args.command} : {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
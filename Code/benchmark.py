@@ -0,0 +1,212 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import platform
+import tempfile
+import numpy as np
+import pandas as pd
+
+from market_data import synthetic_ohlcv
+import Momentum_opti as opti
+import indicators
+from streaming_indicators import SMA, RSI
+from csv_follower import CsvFollower
+from portfolio_backtest import backtest_portfolio
+
+# Banc de mesure des noyaux de calcul sur données synthétiques reproductibles (GBM + volume) :
+# aucun classeur Excel ni accès réseau nécessaire.
+# python benchmark.py --output resultats.json --baseline baseline.json
+DEFAULT_BASELINE = "benchmark_baseline.json"
+tolerance = 0.25  # Un cas est signalé s'il est plus de 25 % plus lent que la référence
+
+# Paramètres de la stratégie utilisés pour les mesures unitaires
+params = (5, 23, 13, 13)
+# Grille réduite par défaut ; --full-grid reprend la grille de Momentum_opti
+small_grid = (range(5, 10), range(10, 20, 2), range(10, 25, 5), range(5, 15, 3))
+full_grid = (range(5, 20), range(10, 30), range(10, 25), range(5, 15))
+
+def synthetic_frame(n_bars, ticker="SYN000", seed=0):
+    # Même format que price_store.load_prices : colonnes date, PRC, VOL, RET
+    end = pd.Timestamp("2000-01-03") + pd.offsets.BDay(n_bars)
+    data = synthetic_ohlcv(ticker, "2000-01-03", end, seed)
+    return pd.DataFrame({
+        "date": data.index,
+        "PRC": data["Close"].to_numpy(),
+        "VOL": data["Volume"].to_numpy(),
+        "RET": data["Close"].pct_change().fillna(0).to_numpy(),
+    })
+
+def synthetic_universe(n_bars, n_tickers, seed=0):
+    # Matrice (dates x tickers) de clôtures, comme price_store.load_universe_matrix
+    frames = {f"SYN{k:03d}": synthetic_frame(n_bars, f"SYN{k:03d}", seed) for k in range(n_tickers)}
+    dates = next(iter(frames.values()))["date"]
+    return pd.DataFrame({ticker: df["PRC"].to_numpy() for ticker, df in frames.items()}, index=pd.DatetimeIndex(dates, name="date"))
+
+def measure(func, repeat=5, items=1):
+    # Un appel de chauffe puis `repeat` mesures ; le minimum est le chiffre le plus stable
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings)
+    return {
+        "min": float(timings.min()),
+        "median": float(np.median(timings)),
+        "repeat": repeat,
+        "items": items,
+        "us_per_item": float(timings.min() / items * 1e6),
+    }
+
+def legacy_indicators(prices, window):
+    # Boucle d'origine : RSI recalculé sur l'historique complet à chaque barre
+    history = []
+    for price in prices:
+        history.append(price)
+        opti.calculate_rsi(history, window)
+
+def streaming_indicators(prices):
+    sma, rsi = SMA(5), RSI(24)
+    for price in prices:
+        sma.update(price)
+        rsi.update(price)
+
+def live_ticks(df):
+    from momentum_trade import LiveStrategy
+    strategy = LiveStrategy(start_date=df["date"].iloc[0])
+    for date, price in zip(df["date"], df["PRC"]):
+        strategy.on_tick(date, price)
+    return strategy
+
+def live_ticks_profiled(df):
+    # Même boucle avec la mesure des latences activée : coût de l'instrumentation
+    from momentum_trade import LiveStrategy, profiled_tick
+    from latency import LatencyProfiler
+    strategy = LiveStrategy(start_date=df["date"].iloc[0])
+    profiler = LatencyProfiler(True)
+    for date, price in zip(df["date"], df["PRC"]):
+        profiled_tick(strategy, profiler, date, price, profiler.now())
+    return strategy
+
+def live_csv(df, folder):
+    # Flux complet : écriture du CSV puis lecture incrémentale et traitement tick par tick
+    from momentum_trade import LiveStrategy
+    path = os.path.join(folder, "flux.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "TICKER", "PRC"])
+        writer.writerows(zip(df["date"].dt.strftime("%Y-%m-%d"), ["SYN000"] * len(df), df["PRC"]))
+    strategy = LiveStrategy(start_date=df["date"].iloc[0])
+    reader = CsvFollower(path)
+    for row in reader.poll():
+        strategy.on_tick(row["date"], row["PRC"])
+    return strategy
+
+def run_benchmarks(n_bars=2000, n_tickers=100, repeat=5, grid=small_grid, legacy=True, only=None):
+    df = synthetic_frame(n_bars)
+    prices = df["PRC"].to_numpy(dtype=float)
+    volumes = df["VOL"].to_numpy(dtype=float)
+    universe = synthetic_universe(n_bars, n_tickers)
+    n_combinations = sum(1 for _ in opti.iter_combinations(*grid))
+
+    cases = {
+        "indicators.ema_series": (lambda: indicators.ema_series(prices, params[0]), n_bars),
+        "indicators.macd_series": (lambda: indicators.macd_series(indicators.ema_series(prices, params[0]), indicators.ema_series(prices, params[1]), params[3]), n_bars),
+        "indicators.rsi_series": (lambda: indicators.rsi_series(prices, params[2]), n_bars),
+        "indicators.trend_slope": (lambda: indicators.trend_slope_series(prices, 20), n_bars),
+        "indicators.bollinger": (lambda: indicators.bollinger_series(prices, 20), n_bars),
+        "indicators.vwap": (lambda: indicators.vwap_series(prices, volumes, 20), n_bars),
+        "indicators.streaming_sma_rsi": (lambda: streaming_indicators(prices), n_bars),
+        "backtest.numpy": (lambda: opti.apply_strategy_numpy(prices, *params), n_bars),
+        "backtest.universe": (lambda: opti.backtest_universe(universe, *params), n_bars * n_tickers),
+        "backtest.portfolio_events": (lambda: backtest_portfolio(universe, *params), n_bars * n_tickers),
+        "sweep.numpy": (lambda: opti.sweep(df, *grid, cache=True, verbose=False), n_combinations),
+        "sweep.numpy_nocache": (lambda: opti.sweep(df, *grid, cache=False, verbose=False), n_combinations),
+        "sweep.batch": (lambda: opti.sweep(df, *grid, mode="batch", verbose=False), n_combinations),
+        "live.ticks": (lambda: live_ticks(df), n_bars),
+        "live.ticks_profiled": (lambda: live_ticks_profiled(df), n_bars),
+    }
+    if legacy:
+        # Versions boucle d'origine (coût quadratique) : référence pour mesurer les gains
+        cases["indicators.rsi_legacy"] = (lambda: legacy_indicators(prices, params[2]), n_bars)
+        cases["backtest.loop"] = (lambda: opti.apply_strategy(df, *params), n_bars)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        cases["live.csv"] = (lambda: live_csv(df, folder), n_bars)
+        for name, (func, items) in cases.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            # Les boucles d'origine sont lentes : une seule mesure suffit
+            results[name] = measure(func, 1 if name in ("indicators.rsi_legacy", "backtest.loop") else repeat, items)
+            print(f"{name:<32} {results[name]['min'] * 1e3:>10.2f} ms  ({results[name]['us_per_item']:.3f} µs/élément)")
+
+    return {
+        "meta": {
+            "date": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "n_bars": n_bars,
+            "n_tickers": n_tickers,
+            "n_combinations": n_combinations,
+        },
+        "benchmarks": results,
+    }
+
+def compare(results, baseline, tolerance=tolerance):
+    # Comparaison sur le minimum : un cas est une régression s'il dépasse la référence de plus de `tolerance`
+    regressions = []
+    if (results["meta"]["n_bars"], results["meta"]["n_tickers"]) != (baseline["meta"]["n_bars"], baseline["meta"]["n_tickers"]):
+        print("Attention : tailles de données différentes de la référence")
+    for name, current in results["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        ratio = current["min"] / reference["min"] if reference["min"] > 0 else float("inf")
+        status = "RÉGRESSION" if ratio > 1 + tolerance else ("gain" if ratio < 1 - tolerance else "ok")
+        print(f"{name:<32} {reference['min'] * 1e3:>10.2f} ms -> {current['min'] * 1e3:>10.2f} ms  x{ratio:.2f}  {status}")
+        if status == "RÉGRESSION":
+            regressions.append((name, ratio))
+    return regressions
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure des performances sur données synthétiques")
+    parser.add_argument("--bars", type=int, default=2000, help="longueur des séries (barres journalières)")
+    parser.add_argument("--tickers", type=int, default=100, help="taille de l'univers pour backtest.universe")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--full-grid", action="store_true", help="grille complète de Momentum_opti au lieu de la grille réduite")
+    parser.add_argument("--no-legacy", action="store_true", help="ne pas mesurer les boucles d'origine (lentes)")
+    parser.add_argument("--only", nargs="*", default=None, help="préfixes des cas à mesurer (ex. indicators backtest.numpy)")
+    parser.add_argument("--output", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--baseline", default=None, help=f"référence à comparer (par défaut {DEFAULT_BASELINE} si présent)")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistrer les résultats comme nouvelle référence")
+    parser.add_argument("--tolerance", type=float, default=tolerance)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.bars, args.tickers, args.repeat, full_grid if args.full_grid else small_grid, not args.no_legacy, args.only)
+    if args.output:
+        write_json(args.output, results)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.save_baseline:
+        write_json(baseline_path, results)
+        print(f"Référence enregistrée dans {baseline_path}")
+    elif os.path.isfile(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+            sys.exit(1)
+        print("Aucune régression")
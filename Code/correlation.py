@@ -1,5 +1,5 @@
 import pandas as pd
-import yfinance as yf
+from market_data import default_provider, fetch_many
 import os
 from datetime import datetime
 
@@ -13,8 +13,10 @@ df_return = pd.DataFrame()
 output_folder = r"H:\Documents\ING3\Cash\Python_Trading"  #CHEMIN A MODIFIER SELON VOTRE EMPLACEMENT DANS VOS DOSSIERS
 output_file = os.path.join(output_folder, 'Corellation.xlsx')
 
-for ticker in tickers:
-    temp = yf.download(ticker, start = start_date, end = end_date)
+# Téléchargements en parallèle, avec cache disque (ALGOTRADE_OFFLINE=1 : sans réseau)
+all_data = fetch_many(default_provider(), tickers, start_date, end_date)
+
+for ticker, temp in all_data.items():
     temp['return'] = temp['Close']/temp['Open']
     df_return[ticker] = temp['return']
     
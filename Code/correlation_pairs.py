@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+# Extraction des paires corrélées à partir d'une matrice de corrélation, sans double boucle Python
+PAIR_COLUMNS = ['Entreprise 1', 'Entreprise 2', 'Coefficient de Corrélation']
+
+def overlap_matrix(returns):
+    # Nombre d'observations communes à chaque paire de tickers (même base que DataFrame.corr)
+    valid = returns.notna().to_numpy(dtype=np.float32)
+    return pd.DataFrame((valid.T @ valid).astype(np.int32), index=returns.columns, columns=returns.columns)
+
+def extract_pairs(correlation_matrix, threshold=0.7, top_k=None, overlap=None, min_overlap=0):
+    corr = correlation_matrix.to_numpy(dtype=np.float64)
+    names = np.asarray(correlation_matrix.columns)
+    # Triangle inférieur (j < i) : mêmes paires et même orientation que la boucle d'origine
+    i, j = np.tril_indices(len(names), k=-1)
+    values = corr[i, j]
+    keep = np.abs(values) > threshold
+    if overlap is not None and min_overlap:
+        keep &= overlap.to_numpy()[i, j] >= min_overlap
+    i, j, values = i[keep], j[keep], values[keep]
+
+    # Tri par |corrélation| décroissante
+    order = np.argsort(-np.abs(values), kind='stable')
+    i, j, values = i[order], j[order], values[order]
+
+    if top_k is not None:
+        # Une paire est conservée si elle fait partie des k plus fortes de l'un de ses deux tickers
+        ticker = np.concatenate([i, j])
+        rank_order = np.concatenate([np.arange(len(i)), np.arange(len(i))])
+        by_strength = np.argsort(rank_order, kind='stable')
+        ticker, rank_order = ticker[by_strength], rank_order[by_strength]
+        ranks = pd.Series(rank_order).groupby(ticker).cumcount().to_numpy()
+        selected = np.zeros(len(i), dtype=bool)
+        selected[rank_order[ranks < top_k]] = True
+        i, j, values = i[selected], j[selected], values[selected]
+
+    pairs = pd.DataFrame({
+        PAIR_COLUMNS[0]: pd.Categorical(names[i], categories=names),
+        PAIR_COLUMNS[1]: pd.Categorical(names[j], categories=names),
+        PAIR_COLUMNS[2]: values.astype(np.float32),
+    })
+    if overlap is not None:
+        pairs['Observations'] = overlap.to_numpy()[i, j]
+    return pairs
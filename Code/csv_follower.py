@@ -0,0 +1,133 @@
+import os
+import csv
+import math
+import time
+from datetime import datetime
+
+# Lecture incrémentale d'un CSV alimenté en continu (flux_financier.csv) :
+# on mémorise la position en octets et on ne parse que les lignes complètes ajoutées depuis le dernier appel.
+
+def parse_date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        import pandas as pd
+        return pd.to_datetime(value).to_pydatetime()
+
+def parse_float(value):
+    try:
+        return float(value.replace(',', '.'))
+    except ValueError:
+        return math.nan
+
+class CsvFollower:
+    def __init__(self, path, date_columns=("date",), encoding="utf-8", profiler=None):
+        self.path = path
+        # latency.LatencyProfiler optionnel : étapes "read" et "parse" ; polled_at = début de la lecture des dernières lignes
+        self.profiler = profiler
+        self.polled_at = 0
+        self.date_columns = set(date_columns)
+        self.encoding = encoding
+        self.offset = 0
+        self.inode = None
+        self.mtime = None
+        self.tail = b""
+        self.header = None
+        self.converters = None
+
+    def reset(self):
+        self.offset = 0
+        self.tail = b""
+        self.header = None
+        self.converters = None
+
+    def _infer_converter(self, column, value):
+        # Type fixé par la première valeur non vide de la colonne ; colonne numérique : float ou NaN valeur par valeur
+        if column in self.date_columns:
+            return parse_date
+        try:
+            float(value.replace(',', '.'))
+            return parse_float
+        except ValueError:
+            return str
+
+    def _convert(self, row):
+        converters = self.converters
+        if None not in converters:
+            return {column: convert(value) for column, convert, value in zip(self.header, converters, row)}
+        # Colonnes encore indéterminées (valeurs vides jusqu'ici) : NaN en attendant une valeur
+        values = {}
+        for k, (column, value) in enumerate(zip(self.header, row)):
+            if converters[k] is None:
+                if not value.strip():
+                    values[column] = math.nan
+                    continue
+                converters[k] = self._infer_converter(column, value)
+            values[column] = converters[k](value)
+        return values
+
+    def poll(self):
+        # Retourne la liste des nouvelles lignes complètes, typées (dict colonne -> valeur)
+        start = self.profiler.now() if self.profiler is not None else 0
+        stat = os.stat(self.path)
+        # Fichier recréé (rotation) ou tronqué : on repart du début
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.offset):
+            self.reset()
+        # Taille inchangée mais fichier modifié : réécrit sur place, relu depuis le début
+        elif stat.st_size == self.offset and self.mtime is not None and stat.st_mtime_ns != self.mtime:
+            self.reset()
+        self.inode = stat.st_ino
+        self.mtime = stat.st_mtime_ns
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            # Fichier réécrit sur place : les derniers octets déjà lus ont changé
+            if self.tail:
+                f.seek(self.offset - len(self.tail))
+                if f.read(len(self.tail)) != self.tail:
+                    self.reset()
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        end = data.rfind(b"\n")
+        if end < 0:
+            # Ligne en cours d'écriture : on attend qu'elle soit terminée
+            return []
+        self.offset += end + 1
+        self.tail = (self.tail + data[:end + 1])[-64:]
+        self.polled_at = start
+        start = self.profiler.lap("read", start) if start else 0
+
+        rows = []
+        for row in csv.reader(data[:end + 1].decode(self.encoding).splitlines()):
+            if not row:
+                continue
+            if self.header is None:
+                self.header = row
+                continue
+            if self.converters is None:
+                self.converters = [parse_date if column in self.date_columns else None for column in self.header]
+            rows.append(self._convert(row))
+        if start:
+            self.profiler.lap("parse", start)
+        return rows
+
+    def follow(self, min_interval=0.01, max_interval=1.0, timeout=None, yield_empty=False):
+        # Générateur de paquets de lignes : l'attente double tant que rien n'arrive, et revient au minimum dès qu'il y a des données
+        # yield_empty=True : une liste vide est aussi renvoyée à chaque attente (rafraîchissement de l'interface pendant les pauses du flux)
+        interval = min_interval
+        waited = 0.0
+        while True:
+            rows = self.poll()
+            if rows:
+                interval = min_interval
+                waited = 0.0
+                yield rows
+                continue
+            if timeout is not None and waited >= timeout:
+                return
+            time.sleep(interval)
+            waited += interval
+            interval = min(interval * 2, max_interval)
+            if yield_empty:
+                yield []
@@ -3,25 +3,21 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib import animation
 from datetime import datetime, timedelta
+from price_store import load_prices, list_tickers
 
 ticker = "AAPL"
 file_path = "data/resultat_s&p500_trie.xlsx"
 start_date = datetime(2023, 12, 31) - timedelta(days=2 * 365)
 
-# Charger les données depuis Excel avec gestion des exceptions
+# Charger les données (store colonne si disponible, sinon classeur Excel) avec gestion des exceptions
 try:
-    xls = pd.ExcelFile(file_path)
-    if ticker not in xls.sheet_names:
+    if ticker not in list_tickers(workbook=file_path):
         raise ValueError(f"La feuille '{ticker}' est introuvable dans le fichier.")
-    df = pd.read_excel(xls, sheet_name=ticker)
+    # Dates converties et RET nettoyé une fois pour toutes par price_store
+    df = load_prices(ticker, start=start_date, workbook=file_path)
 except Exception as e:
     print(f"Erreur lors du chargement des données : {e}")
     exit()
-    
-# Prétraitement des données
-df["date"] = pd.to_datetime(df['date'])
-df['RET'] = pd.to_numeric(df['RET'].astype(str).str.replace(',', '.', regex=False), errors='coerce')
-df = df[df['date'] >= start_date]
 
 close = []
 time = []
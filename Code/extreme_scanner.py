@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from price_store import default_store_dir, list_tickers, load_arrays
+
+# Scan de tout l'univers du store colonne : rendement Close/Open du jour, volatilité de Parkinson,
+# et valeurs extrêmes (écart à la moyenne du ticker supérieur à k écarts-types) dans une seule table d'événements.
+# Les données sont lues par paquets (bloc de tickers x période) concaténés à plat avec l'indice du ticker :
+# la mémoire dépend de la taille d'un paquet, pas de l'univers. Deux passes : moments par ticker, puis repérage.
+
+# Noms possibles des colonnes dans le store (CRSP, puis Yahoo)
+OHLC_COLUMNS = {
+    "open": ("OPENPRC", "Open"),
+    "high": ("ASKHI", "High"),
+    "low": ("BIDLO", "Low"),
+    "close": ("PRC", "Close"),
+}
+PARKINSON_FACTOR = np.sqrt(1 / (4 * np.log(2)))
+
+def ohlc_columns(ticker, store_dir):
+    # Colonne retenue pour chaque rôle (None si absente du ticker)
+    with open(os.path.join(store_dir, ticker, "columns.json"), encoding="utf-8") as f:
+        available = set(json.load(f))
+    return {role: next((c for c in names if c in available), None) for role, names in OHLC_COLUMNS.items()}
+
+def year_periods(first, last, years):
+    # Bornes [début, fin] sans recouvrement : _date_slice inclut les deux bornes
+    starts = [pd.Timestamp(year, 1, 1) for year in range(first.year, last.year + 1, years)]
+    return [(start, pd.Timestamp(start.year + years, 1, 1) - pd.Timedelta(1, "ns")) for start in starts]
+
+def _bounds(store_dir, ticker):
+    dates = np.load(os.path.join(store_dir, ticker, "date.npy"), mmap_mode="r")
+    return dates[[0, -1]] if len(dates) else dates[:0]
+
+def iter_blocks(tickers, store_dir, tickers_per_chunk=100, years_per_chunk=None, start=None, end=None):
+    # Paquets (indices des tickers, dates, open, high, low, close) ; prix absents : NaN
+    periods = [(start, end)]
+    if years_per_chunk:
+        bounds = np.concatenate([_bounds(store_dir, ticker) for ticker in tickers])
+        first = pd.Timestamp(bounds.min()) if start is None else max(pd.Timestamp(bounds.min()), pd.Timestamp(start))
+        last = pd.Timestamp(bounds.max()) if end is None else min(pd.Timestamp(bounds.max()), pd.Timestamp(end))
+        periods = [(max(p_start, first), min(p_end, last)) for p_start, p_end in year_periods(first, last, years_per_chunk)]
+
+    for block in range(0, len(tickers), tickers_per_chunk):
+        # Memmaps du bloc ouverts une fois pour toutes ses périodes (un descripteur de fichier par colonne)
+        opened = {}
+        for k in range(block, min(block + tickers_per_chunk, len(tickers))):
+            columns = ohlc_columns(tickers[k], store_dir)
+            opened[k] = (columns, load_arrays(tickers[k], columns=[c for c in columns.values() if c is not None], store_dir=store_dir))
+        for p_start, p_end in periods:
+            ids, dates, values = [], [], {role: [] for role in OHLC_COLUMNS}
+            for k, (columns, arrays) in opened.items():
+                lo = 0 if p_start is None else np.searchsorted(arrays["date"], np.datetime64(pd.Timestamp(p_start), "ns"), side="left")
+                hi = len(arrays["date"]) if p_end is None else np.searchsorted(arrays["date"], np.datetime64(pd.Timestamp(p_end), "ns"), side="right")
+                if hi <= lo:
+                    continue
+                ids.append(np.full(hi - lo, k, dtype=np.int32))
+                dates.append(arrays["date"][lo:hi])
+                for role, column in columns.items():
+                    # Prix CRSP négatifs : moyenne bid/ask, seule la valeur absolue compte
+                    values[role].append(np.abs(np.asarray(arrays[column][lo:hi], dtype=np.float64)) if column else np.full(hi - lo, np.nan))
+            if ids:
+                yield (np.concatenate(ids), np.concatenate(dates), *(np.concatenate(values[role]) for role in OHLC_COLUMNS))
+        del opened
+
+def day_metrics(open_, high, low, close):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        day_return = close / open_ - 1
+        parkinson = PARKINSON_FACTOR * np.abs(np.log(high / low))
+    day_return[~np.isfinite(day_return)] = np.nan
+    parkinson[~np.isfinite(parkinson)] = np.nan
+    return day_return, parkinson
+
+class Moments:
+    # Effectif, moyenne et somme des carrés des écarts par ticker, fusionnés paquet après paquet (Chan et al.)
+    def __init__(self, n):
+        self.count = np.zeros(n)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+
+    def update(self, ids, values):
+        valid = ~np.isnan(values)
+        ids, values = ids[valid], values[valid]
+        n = len(self.count)
+        count = np.bincount(ids, minlength=n).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, np.bincount(ids, values, minlength=n) / count, 0.0)
+        m2 = np.bincount(ids, (values - mean[ids]) ** 2, minlength=n)
+        total = self.count + count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.count * weight
+        self.mean += delta * weight
+        self.count = total
+
+    def std(self):
+        # Écart-type d'échantillon (ddof=1), comme pandas
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+def scan_universe(tickers=None, k_return=2.0, k_vol=2.0, tickers_per_chunk=100, years_per_chunk=None, start=None, end=None,
+                  store_dir=None, workbook=None):
+    # Retourne (événements, statistiques par ticker)
+    # extreme_return : |rendement - moyenne| > k_return écarts-types ; extreme_vol : volatilité > moyenne + k_vol écarts-types
+    store_dir = store_dir or default_store_dir(workbook)
+    tickers = list(tickers or list_tickers(store_dir))
+    returns, volatility = Moments(len(tickers)), Moments(len(tickers))
+
+    def blocks():
+        return iter_blocks(tickers, store_dir, tickers_per_chunk, years_per_chunk, start, end)
+
+    peak = 0
+    for ids, dates, open_, high, low, close in blocks():
+        day_return, parkinson = day_metrics(open_, high, low, close)
+        returns.update(ids, day_return)
+        volatility.update(ids, parkinson)
+        peak = max(peak, ids.nbytes + dates.nbytes + 6 * close.nbytes)
+
+    return_std, vol_std = returns.std(), volatility.std()
+    events = []
+    for ids, dates, open_, high, low, close in blocks():
+        day_return, parkinson = day_metrics(open_, high, low, close)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return_z = (day_return - returns.mean[ids]) / return_std[ids]
+            vol_z = (parkinson - volatility.mean[ids]) / vol_std[ids]
+        extreme_return = np.abs(return_z) > k_return
+        extreme_vol = vol_z > k_vol
+        rows = np.flatnonzero(extreme_return | extreme_vol)
+        events.append(pd.DataFrame({
+            "date": dates[rows],
+            "ticker": pd.Categorical.from_codes(ids[rows], categories=tickers),
+            "day_return": day_return[rows].astype(np.float32),
+            "parkinson_vol": parkinson[rows].astype(np.float32),
+            "return_z": return_z[rows].astype(np.float32),
+            "vol_z": vol_z[rows].astype(np.float32),
+            "extreme_return": extreme_return[rows],
+            "extreme_vol": extreme_vol[rows],
+        }))
+
+    columns = ["date", "ticker", "day_return", "parkinson_vol", "return_z", "vol_z", "extreme_return", "extreme_vol"]
+    events = pd.concat(events, ignore_index=True) if events else pd.DataFrame(columns=columns)
+    events = events.sort_values(["date", "ticker"], kind="stable", ignore_index=True)
+    stats = pd.DataFrame({
+        "observations": returns.count.astype(np.int64),
+        "return_mean": returns.mean, "return_std": return_std,
+        "vol_mean": volatility.mean, "vol_std": vol_std,
+    }, index=pd.Index(tickers, name="ticker"))
+    stats.attrs["peak_chunk_bytes"] = peak
+    return events, stats
+
+def write_events(events, output_file):
+    # Format choisi par l'extension : .parquet (pyarrow), .csv ou classeur Excel (un seul onglet)
+    if output_file.endswith(".parquet"):
+        events.to_parquet(output_file, index=False)
+    elif output_file.endswith(".csv"):
+        events.to_csv(output_file, index=False)
+    else:
+        from workbook_writer import BulkWorkbookWriter
+        with BulkWorkbookWriter(output_file) as writer:
+            writer.write("events", events, index=False)
+
+if __name__ == "__main__":
+    file_path = "data/resultat_s&p500_trie.xlsx"  # Le store colonne est lu à côté du classeur
+    output_folder = "data/"  #CHEMIN A MODIFIER SELON VOTRE EMPLACEMENT DANS VOS DOSSIERS
+    output_file = os.path.join(output_folder, 'Extreme_events.xlsx')
+    k_return = 2.0
+    k_vol = 2.0  # Queue droite de la distribution de la volatilité, comme test_pandas.py
+    tickers_per_chunk = 100
+    years_per_chunk = 5  # None : tout l'historique d'un bloc de tickers en une fois
+
+    start = time.perf_counter()
+    events, stats = scan_universe(None, k_return, k_vol, tickers_per_chunk, years_per_chunk, workbook=file_path)
+    elapsed = time.perf_counter() - start
+    print(f"{len(stats)} tickers, {int(stats['observations'].sum())} barres en {elapsed:.2f} s "
+          f"(paquet le plus lourd : {stats.attrs['peak_chunk_bytes'] / 1024 ** 2:.1f} Mo)")
+    print(f"{len(events)} événements : {int(events['extreme_return'].sum())} rendements extrêmes, {int(events['extreme_vol'].sum())} volatilités extrêmes")
+    write_events(events, output_file)
+    print(f"Table des événements enregistrée dans {output_file}")
@@ -1,8 +1,8 @@
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import os
-from openpyxl import load_workbook
+from workbook_writer import BulkWorkbookWriter, ParquetDatasetWriter
+from market_data import default_provider, fetch_many
 
 # Récupération des composantes du S&P
 sp500_url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
@@ -23,29 +23,23 @@ os.makedirs(output_folder, exist_ok=True)
 # 4. Nom du fichier Excel de sortie
 output_file = os.path.join(output_folder, 'SP500_Historic_Data.xlsx')
 
-# 5. Télécharger les données pour chaque ticker
-for ticker in tickers:
-    print(f"Telechargement des donnees pour {ticker}...")
-    
-    # Télécharger les données avec yfinance
-    data = yf.download(ticker, start=start_date, end=end_date)
-    data['Ticker'] = ticker  # Ajouter une colonne pour identifier le ticker
-
-    try:
-        # Charger le fichier Excel s'il existe
-        wb = load_workbook(output_file)
-        # Supprimer la feuille si elle existe déjà pour éviter les doublons
-        if ticker in wb.sheetnames:
-            del wb[ticker]
-        wb.save(output_file)
-
-        # Ouvrir le fichier en mode append
-        with pd.ExcelWriter(output_file, engine='openpyxl', mode='a', if_sheet_exists='new') as writer:
-            data.to_excel(writer, sheet_name=ticker)  # Écrire les données dans une nouvelle feuille
-
-    except FileNotFoundError:
-        # Si le fichier n'existe pas encore, le créer et y ajouter la première feuille
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            data.to_excel(writer, sheet_name=ticker)  # Créer une nouvelle feuille pour ce ticker
+# Sortie Parquet optionnelle (une partition par ticker, ajout sans réécriture) ; None pour la désactiver
+parquet_folder = None  # ex. os.path.join(output_folder, 'SP500_Historic_Data_parquet')
+parquet_writer = ParquetDatasetWriter(parquet_folder) if parquet_folder else None
+
+# 5. Télécharger les données de tous les tickers en parallèle (cache disque : seules les périodes manquantes sont téléchargées)
+# ALGOTRADE_OFFLINE=1 pour utiliser des données enregistrées/synthétiques sans réseau
+print(f"Telechargement des donnees pour {len(tickers)} tickers...")
+all_data = fetch_many(default_provider(), tickers, start_date, end_date)
+
+# Tous les onglets écrits en une seule passe
+with BulkWorkbookWriter(output_file) as writer:
+    for ticker, data in all_data.items():
+        data['Ticker'] = ticker  # Ajouter une colonne pour identifier le ticker
+
+        # Onglet écrit en flux (remplace la feuille existante du même nom)
+        writer.write(ticker, data)
+        if parquet_writer:
+            parquet_writer.write(ticker, data)
 
 print(f"Donnees enregistrees dans le fichier : {output_file}")
\ No newline at end of file
@@ -0,0 +1,188 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Indicateurs techniques calculés sur toute la série en une fois (versions vectorisées des anciens calculs par barre).
+# Convention commune : le résultat a la forme de l'entrée, NaN tant que la fenêtre n'est pas pleine,
+# et les séries sont parcourues selon l'axe 0 : un tableau 2D (temps x tickers) est traité colonne par colonne en une passe.
+# EMA et ligne de signal du MACD : récurrence en numpy seul (scipy n'est ni importé ni nécessaire), une boucle sur le temps.
+
+def _rolling(values, N):
+    # Fenêtres glissantes de N lignes : forme (len - N + 1, ..., N)
+    return sliding_window_view(values, N, axis=0)
+
+def _aligned(values, rolled, N):
+    out = np.full(values.shape, np.nan)
+    out[N - 1:] = rolled
+    return out
+
+def sma_series(prices, N):
+    prices = np.asarray(prices, dtype=float)
+    if len(prices) < N or N < 1:
+        return np.full(prices.shape, np.nan)
+    return _aligned(prices, _rolling(prices, N).mean(axis=-1), N)
+
+def volatility_series(values, N):
+    # Écart-type (population, comme np.std) des N dernières valeurs
+    values = np.asarray(values, dtype=float)
+    if len(values) < N or N < 1:
+        return np.full(values.shape, np.nan)
+    return _aligned(values, _rolling(values, N).std(axis=-1), N)
+
+def rolling_max(values, N):
+    values = np.asarray(values, dtype=float)
+    if len(values) < N or N < 1:
+        return np.full(values.shape, np.nan)
+    return _aligned(values, _rolling(values, N).max(axis=-1), N)
+
+def rolling_min(values, N):
+    values = np.asarray(values, dtype=float)
+    if len(values) < N or N < 1:
+        return np.full(values.shape, np.nan)
+    return _aligned(values, _rolling(values, N).min(axis=-1), N)
+
+def stochastic_series(prices, N, high=None, low=None):
+    # %K : position du prix dans le range des N dernières barres (plus hauts / plus bas des clôtures par défaut)
+    prices = np.asarray(prices, dtype=float)
+    highest = rolling_max(prices if high is None else high, N)
+    lowest = rolling_min(prices if low is None else low, N)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (prices - lowest) / (highest - lowest) * 100
+
+def _ema_recursion(values, multiplier, previous):
+    # ema[t] = values[t] * m + ema[t-1] * (1 - m), même formule que l'EMA barre par barre (Momentum_opti.EMA)
+    # 1D : boucle sur des floats Python ; 2D (temps x tickers ou combinaisons) : une ligne d'état mise à jour sur place
+    keep = 1 - multiplier
+    if values.ndim == 1:
+        out = []
+        append = out.append
+        for value in values.tolist():
+            previous = value * multiplier + previous * keep
+            append(previous)
+        return np.array(out, dtype=float)
+    out = values * multiplier
+    np.add(out[0], np.multiply(previous, keep), out=out[0])
+    scratch = np.empty(values.shape[1:])
+    for t in range(1, len(out)):
+        np.multiply(out[t - 1], keep, out=scratch)
+        out[t] += scratch
+    return out
+
+def ema_series(prices, window):
+    # EMA initialisée par la SMA des `window` premiers prix, NaN avant
+    prices = np.asarray(prices, dtype=float)
+    ema = np.full(prices.shape, np.nan)
+    if len(prices) < window:
+        return ema
+    multiplier = 2 / (window + 1)
+    seed = np.mean(prices[:window], axis=0)
+    ema[window - 1] = seed
+    if len(prices) > window:
+        ema[window:] = _ema_recursion(prices[window:], multiplier, seed if prices.ndim > 1 else float(seed))
+    return ema
+
+def macd_series(ema_short, ema_long, window_signal):
+    MACD = ema_short - ema_long
+    signal_line = np.full(MACD.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(MACD).all(axis=tuple(range(1, MACD.ndim))))
+    if len(valid) == 0:
+        return MACD, signal_line
+    start = valid[0]
+    # La ligne de signal démarre sur la première valeur du MACD
+    multiplier = 2 / (window_signal + 1)
+    signal_line[start] = MACD[start]
+    if len(MACD) > start + 1:
+        signal_line[start + 1:] = _ema_recursion(MACD[start + 1:], multiplier, MACD[start] if MACD.ndim > 1 else float(MACD[start]))
+    return MACD, signal_line
+
+def macd_histogram(MACD, signal_line):
+    # 0 tant que le MACD ou la ligne de signal n'est pas défini
+    histogram = MACD - signal_line
+    return np.where(np.isnan(histogram), 0.0, histogram)
+
+def rsi_series(prices, N):
+    # Moyenne simple des N derniers gains / pertes ; 100 si aucune perte sur la fenêtre
+    prices = np.asarray(prices, dtype=float)
+    rsi = np.full(prices.shape, np.nan)
+    if len(prices) < N or N < 1:
+        return rsi
+    deltas = np.diff(prices, axis=0)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    gain = np.empty((len(prices) - N + 1,) + prices.shape[1:])
+    loss = np.empty((len(prices) - N + 1,) + prices.shape[1:])
+    # Au rang N-1 on ne dispose que de N-1 écarts
+    gain[0] = np.mean(gains[:N - 1], axis=0) if N > 1 else np.nan
+    loss[0] = np.mean(losses[:N - 1], axis=0) if N > 1 else np.nan
+    if len(deltas) >= N:
+        gain[1:] = _rolling(gains, N).mean(axis=-1)
+        loss[1:] = _rolling(losses, N).mean(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi[N - 1:] = np.where(loss == 0, 100, 100 - (100 / (1 + gain / loss)))
+    return rsi
+
+def trend_slope_series(values, window):
+    # Pente de la régression linéaire des `window` dernières valeurs sur x = 0..window-1 (même résultat que linregress),
+    # en forme close à partir de sommes cumulées : coût O(n) quelle que soit la fenêtre.
+    # pente = (Σ x·y - x̄ Σ y) / Σ (x - x̄)² ; une fenêtre contenant un NaN donne NaN.
+    values = np.asarray(values, dtype=float)
+    slope = np.full(values.shape, np.nan)
+    if len(values) < window or window < 2:
+        return slope
+    missing = np.isnan(values)
+    # Recentrage sur la moyenne : sommes plus petites, moins d'erreur d'arrondi (la pente n'en dépend pas)
+    with np.errstate(invalid='ignore'):
+        reference = np.nanmean(values, axis=0) if not missing.all() else 0.0
+    y = np.where(missing, 0.0, values - reference)
+    column = (-1,) + (1,) * (values.ndim - 1)
+    t = np.arange(len(values), dtype=float).reshape(column)
+    zero = np.zeros((1,) + values.shape[1:])
+    sum_y = np.concatenate([zero, np.cumsum(y, axis=0)])
+    sum_ty = np.concatenate([zero, np.cumsum(t * y, axis=0)])
+    nan_count = np.concatenate([zero, np.cumsum(missing, axis=0)])
+
+    end = np.arange(window, len(values) + 1)
+    start = end - window
+    window_y = sum_y[end] - sum_y[start]
+    # Σ x·y avec x = t - start
+    window_xy = sum_ty[end] - sum_ty[start] - start.reshape(column) * window_y
+    x_mean = (window - 1) / 2
+    x_var = window * (window ** 2 - 1) / 12  # Σ (x - x̄)²
+    slope[window - 1:] = np.where(nan_count[end] - nan_count[start] > 0, np.nan, (window_xy - x_mean * window_y) / x_var)
+    return slope
+
+def bollinger_series(prices, N=20, k=2.0):
+    # Bandes de Bollinger : SMA N ± k écarts-types (population) des N derniers prix -> (basse, milieu, haute)
+    middle = sma_series(prices, N)
+    width = k * volatility_series(prices, N)
+    return middle - width, middle, middle + width
+
+def vwap_series(prices, volumes, window=None):
+    # Prix moyen pondéré par les volumes : cumulé depuis le début (window=None) ou sur les `window` dernières barres
+    prices = np.asarray(prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    weighted = np.cumsum(prices * volumes, axis=0)
+    total = np.cumsum(volumes, axis=0)
+    if window is not None:
+        weighted[window:] = weighted[window:] - weighted[:-window]
+        total[window:] = total[window:] - total[:-window]
+        weighted[:window - 1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return weighted / total
+
+FIBONACCI_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+
+def fibonacci_levels(prices, window=None, ratios=FIBONACCI_RATIOS, high=None, low=None):
+    # Niveaux de retracement de Fibonacci : plus haut - ratio x (plus haut - plus bas),
+    # sur les `window` dernières barres ou depuis le début de la série (window=None).
+    # Résultat : forme de l'entrée + une dernière dimension par ratio.
+    prices = np.asarray(prices, dtype=float)
+    high = prices if high is None else np.asarray(high, dtype=float)
+    low = prices if low is None else np.asarray(low, dtype=float)
+    if window is None:
+        highest = np.fmax.accumulate(high, axis=0)
+        lowest = np.fmin.accumulate(low, axis=0)
+    else:
+        highest = rolling_max(high, window)
+        lowest = rolling_min(low, window)
+    ratios = np.asarray(ratios, dtype=float)
+    return highest[..., None] - ratios * (highest - lowest)[..., None]
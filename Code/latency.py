@@ -0,0 +1,133 @@
+import os
+import json
+import time
+from collections import deque
+
+# Mesure des latences par étape de la boucle temps réel.
+# t = profiler.now() ... t = profiler.lap("étape", t) : désactivé, now() renvoie 0 et lap() s'arrête immédiatement.
+# Les durées vont dans des histogrammes log-linéaires (coût constant, mémoire fixe) ; la trace se lit dans Perfetto / chrome://tracing.
+
+SUB_BUCKETS = 16  # 16 paquets par puissance de 2 : précision relative ~6 %
+MAX_BUCKETS = 48 * SUB_BUCKETS  # jusqu'à ~2^47 ns, soit plus de 39 heures
+
+def _bucket(ns):
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    shift = ns.bit_length() - 5
+    return min((shift + 1) * SUB_BUCKETS + (ns >> shift) - SUB_BUCKETS, MAX_BUCKETS - 1)
+
+def _bucket_value(index):
+    # Milieu du paquet, en nanosecondes
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low + (1 << shift) // 2
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, ns):
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = max(1, int(round(q / 100 * self.count)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(_bucket_value(index), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        self.__init__()
+
+class LatencyProfiler:
+    def __init__(self, enabled=None, report_every=10.0, trace_size=200_000):
+        # ALGOTRADE_PROFILE=1 active la mesure sans modifier le script
+        if enabled is None:
+            enabled = os.environ.get("ALGOTRADE_PROFILE", "") not in ("", "0")
+        self.enabled = enabled
+        self.report_every = report_every
+        self.histograms = {}
+        # Trace bornée : les événements les plus anciens sont oubliés
+        self.trace = deque(maxlen=trace_size)
+        self.origin = time.perf_counter_ns()
+        self.last_report = time.monotonic()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        print(f"Mesure des latences {'activée' if self.enabled else 'désactivée'}")
+
+    def now(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def lap(self, stage, start):
+        # Enregistre la durée depuis `start` et renvoie l'instant courant (début de l'étape suivante)
+        if not start:
+            return 0
+        end = time.perf_counter_ns()
+        self.record(stage, start, end)
+        return end
+
+    def record(self, stage, start, end):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.record(end - start)
+        self.trace.append((stage, start, end - start))
+
+    def summary(self, percentiles=(50, 95, 99)):
+        lines = [f"{'étape':<18} {'n':>8} " + " ".join(f"{'p' + str(q):>10}" for q in percentiles) + f" {'max':>10}"]
+        for stage, histogram in self.histograms.items():
+            values = " ".join(f"{histogram.percentile(q) / 1e3:>8.1f}µs" for q in percentiles)
+            lines.append(f"{stage:<18} {histogram.count:>8} {values} {histogram.max / 1e3:>8.1f}µs")
+        return "\n".join(lines)
+
+    def maybe_report(self):
+        # Résumé périodique (au plus une fois toutes les `report_every` secondes)
+        if not self.enabled or not self.histograms or time.monotonic() - self.last_report < self.report_every:
+            return
+        self.last_report = time.monotonic()
+        print(self.summary())
+
+    def export_trace(self, path):
+        # Format Chrome Trace Event : une tranche "X" par mesure, horodatage en µs depuis le démarrage
+        events = [{"name": stage, "ph": "X", "ts": (start - self.origin) / 1e3, "dur": duration / 1e3, "pid": 0, "tid": 0}
+                  for stage, start, duration in self.trace]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+    def reset(self):
+        self.histograms.clear()
+        self.trace.clear()
+
+def install_signal_toggle(profiler):
+    # kill -USR1 <pid> active / désactive la mesure pendant l'exécution (Unix uniquement)
+    import signal
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.toggle())
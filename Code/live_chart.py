@@ -0,0 +1,245 @@
+import time
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.collections import PolyCollection
+
+# Graphique temps réel incrémental : artistes créés une seule fois, données ajoutées sur place,
+# historique réduit au min/max par paquet de ticks et rafraîchissement par blitting à cadence plafonnée.
+# Seuls les nouveaux ticks sont convertis et réduits à chaque appel (coût d'une image indépendant de la durée
+# de la session) ; le fond (axes, titres, légendes) n'est redessiné que lorsque les limites des axes
+# doivent s'élargir ou que la fenêtre est redimensionnée.
+
+class GrowingArray:
+    # Tableau à capacité doublée : ajout amorti en O(1), vue contiguë sans copie
+    def __init__(self, capacity=1024, dtype=np.float64):
+        self.values = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.values.dtype)
+        end = self.size + len(values)
+        if end > len(self.values):
+            grown = np.empty(max(end, 2 * len(self.values)), dtype=self.values.dtype)
+            grown[:self.size] = self.values[:self.size]
+            self.values = grown
+        self.values[self.size:end] = values
+        self.size = end
+
+    def view(self):
+        return self.values[:self.size]
+
+def _arg_extremes(blocks):
+    # Indices du min et du max de chaque ligne, NaN ignorés (ligne entièrement NaN : premier indice)
+    nan = np.isnan(blocks)
+    return np.argmin(np.where(nan, np.inf, blocks), axis=-1), np.argmax(np.where(nan, -np.inf, blocks), axis=-1)
+
+class MinMaxDecimator:
+    # Réduction min/max incrémentale d'une série qui ne fait que grandir : chaque paquet complet de `bucket` ticks
+    # est réduit une seule fois (indices de son min et de son max), le paquet en cours est mis à jour avec les seuls
+    # nouveaux ticks. Au-delà de max_buckets paquets, la taille des paquets double (fusion deux à deux des paquets
+    # déjà réduits) : le nombre de points tracés reste borné, quelle que soit la durée de la session.
+    def __init__(self, max_buckets=1000):
+        self.max_buckets = max(int(max_buckets), 1)
+        self.bucket = 1
+        self.done = 0  # ticks couverts par les paquets complets
+        self.seen = 0  # ticks déjà pris en compte
+        self.lo, self.hi = GrowingArray(dtype=np.int64), GrowingArray(dtype=np.int64)
+        self.tail_lo = self.tail_hi = None
+
+    def update(self, y):
+        # y : série complète (vue), dont seuls les ticks après self.seen sont lus
+        n = len(y)
+        complete = self.done + (n - self.done) // self.bucket * self.bucket
+        if complete > self.done:
+            blocks = y[self.done:complete].reshape(-1, self.bucket)
+            offsets = self.done + np.arange(len(blocks)) * self.bucket
+            lo, hi = _arg_extremes(blocks)
+            self.lo.extend(offsets + lo)
+            self.hi.extend(offsets + hi)
+            self.done = complete
+            self.tail_lo = self.tail_hi = None
+            self.seen = max(self.seen, complete)
+        while self.lo.size > self.max_buckets:
+            self._merge(y)
+        # Paquet en cours : min/max mis à jour avec les ticks arrivés depuis l'appel précédent
+        start = max(self.seen, self.done)
+        if n > start:
+            lo, hi = _arg_extremes(y[start:n])
+            candidates_lo = [start + int(lo)] + ([self.tail_lo] if self.tail_lo is not None else [])
+            candidates_hi = [start + int(hi)] + ([self.tail_hi] if self.tail_hi is not None else [])
+            self.tail_lo = min(candidates_lo, key=lambda k: np.inf if np.isnan(y[k]) else y[k])
+            self.tail_hi = max(candidates_hi, key=lambda k: -np.inf if np.isnan(y[k]) else y[k])
+        self.seen = n
+
+    def _merge(self, y):
+        # Paquets fusionnés deux à deux ; un dernier paquet sans partenaire redevient le paquet en cours
+        pairs = self.lo.size // 2
+        lo = self.lo.view()[:2 * pairs].reshape(-1, 2)
+        hi = self.hi.view()[:2 * pairs].reshape(-1, 2)
+        lo = np.take_along_axis(lo, _arg_extremes(y[lo])[0][:, None], axis=1)[:, 0]
+        hi = np.take_along_axis(hi, _arg_extremes(y[hi])[1][:, None], axis=1)[:, 0]
+        self.lo.size = self.hi.size = 0
+        self.lo.extend(lo)
+        self.hi.extend(hi)
+        self.bucket *= 2
+        self.done = pairs * self.bucket
+        # Paquet orphelin et paquet en cours (moins d'un nouveau paquet) : relus pour le nouveau paquet en cours
+        self.seen = self.done
+        self.tail_lo = self.tail_hi = None
+
+    def indices(self):
+        # Indices des points à tracer, dans l'ordre chronologique
+        lo, hi = self.lo.view(), self.hi.view()
+        tail = [k for k in (self.tail_lo, self.tail_hi) if k is not None]
+        index = np.concatenate([np.column_stack([np.minimum(lo, hi), np.maximum(lo, hi)]).ravel(), sorted(tail)]).astype(np.int64)
+        if len(index) > 1:
+            index = index[np.concatenate([[True], index[1:] != index[:-1]])]
+        return index
+
+def _area(x, y, sign):
+    # Polygone entre la courbe et 0, limité à la partie positive (sign=1) ou négative (sign=-1)
+    clipped = np.maximum(y, 0) if sign > 0 else np.minimum(y, 0)
+    return np.concatenate([[[x[0], 0]], np.column_stack([x, clipped]), [[x[-1], 0]]])
+
+class LiveChart:
+    def __init__(self, fig=None, axes=None, max_fps=10, headroom=0.1):
+        import matplotlib.pyplot as plt
+        if fig is None:
+            fig, axes = plt.subplots(1, 2, figsize=(14, 7))
+        self.fig, self.axes = fig, axes
+        self.canvas = fig.canvas
+        self.blit = getattr(self.canvas, "supports_blit", False)
+        self.min_interval = 1 / max_fps if max_fps else 0
+        self.headroom = headroom
+
+        ax_price, ax_pnl = axes
+        animated = self.blit
+        (self.price_line,) = ax_price.plot([], [], label='Close price', animated=animated)
+        (self.buy_markers,) = ax_price.plot([], [], linestyle='', marker='^', color='green', markersize=10, label='Buy Signal', animated=animated)
+        (self.sell_markers,) = ax_price.plot([], [], linestyle='', marker='v', color='red', markersize=10, label='Sell Signal', animated=animated)
+        (self.pnl_line,) = ax_pnl.plot([], [], label='Cumulative PnL', animated=animated)
+        self.pnl_positive = PolyCollection([], facecolor='green', alpha=0.3, animated=animated)
+        self.pnl_negative = PolyCollection([], facecolor='red', alpha=0.3, animated=animated)
+        ax_pnl.add_collection(self.pnl_positive)
+        ax_pnl.add_collection(self.pnl_negative)
+        self.artists = [(ax_price, self.price_line), (ax_price, self.buy_markers), (ax_price, self.sell_markers),
+                        (ax_pnl, self.pnl_positive), (ax_pnl, self.pnl_negative), (ax_pnl, self.pnl_line)]
+
+        ax_price.set_title("Intersection between Close price and SMA 5 days with buy or sell indicator")
+        ax_price.set_xlabel("Date")
+        ax_price.set_ylabel("Price")
+        ax_price.legend(loc='upper left')
+        ax_pnl.set_xlabel("Date")
+        ax_pnl.set_ylabel("PnL")
+        ax_pnl.set_title("PnL over time")
+        ax_pnl.legend(loc='upper left')
+        for ax in axes:
+            ax.xaxis_date()
+
+        self.x, self.price, self.pnl = GrowingArray(), GrowingArray(), GrowingArray()
+        self.buy_x, self.buy_y, self.sell_x, self.sell_y = GrowingArray(64), GrowingArray(64), GrowingArray(64), GrowingArray(64)
+        # Un point min et un point max par pixel de largeur ; étendues des séries tenues à jour tick par tick
+        self.price_points, self.pnl_points = MinMaxDecimator(), MinMaxDecimator()
+        self.price_range = [np.inf, -np.inf]
+        self.pnl_range = [0.0, 0.0]
+        self.limits = None
+        self.background = None
+        self.drawn = 0
+        self.last_frame = 0.0
+        self.frames = 0
+        # Tout redessin complet (premier affichage, redimensionnement) recapture le fond
+        self.canvas.mpl_connect('draw_event', self._capture_background)
+
+    def _capture_background(self, event=None):
+        if self.blit:
+            self.background = [self.canvas.copy_from_bbox(ax.bbox) for ax in self.axes]
+
+    def ingest(self, strategy):
+        # Conversion des seuls ticks ajoutés depuis le dernier appel
+        start = self.x.size
+        end = min(len(strategy.timestamps), len(strategy.pnl))
+        if end > start:
+            self.x.extend(mdates.date2num(strategy.timestamps[start:end]))
+            self.price.extend(strategy.close[start:end])
+            self.pnl.extend(strategy.pnl[start:end])
+            for values, bounds in ((self.price.view()[start:], self.price_range), (self.pnl.view()[start:], self.pnl_range)):
+                if not np.isnan(values).all():
+                    bounds[0] = min(bounds[0], np.nanmin(values))
+                    bounds[1] = max(bounds[1], np.nanmax(values))
+        for times, signals, xs, ys in ((strategy.buy_time, strategy.buy_signal, self.buy_x, self.buy_y),
+                                       (strategy.sell_time, strategy.sell_signal, self.sell_x, self.sell_y)):
+            # Heure et prix du signal ajoutés l'un après l'autre par le fil des ticks : seules les paires complètes sont lues
+            n = min(len(times), len(signals))
+            if n > xs.size:
+                xs.extend(mdates.date2num(times[xs.size:n]))
+                ys.extend(signals[ys.size:n])
+
+    def update(self, strategy, force=False):
+        # Renvoie True si une image a été dessinée ; les ticks restent enregistrés même quand l'image est sautée
+        self.ingest(strategy)
+        if self.x.size == 0 or (self.x.size == self.drawn and not force):
+            return False
+        now = time.monotonic()
+        if not force and now - self.last_frame < self.min_interval:
+            return False
+        self.last_frame = now
+        self.render()
+        return True
+
+    def _needed_limits(self):
+        x = self.x.view()
+        return (x[0], x[-1]), tuple(self.price_range), tuple(self.pnl_range)
+
+    def _expand_limits(self, needed):
+        # Marge ajoutée à chaque élargissement : le fond n'est recapturé que de temps en temps
+        limits = []
+        for k, (low, high) in enumerate(needed):
+            span = (high - low) or max(abs(high), 1.0)
+            # L'axe des dates commence au premier tick, la marge n'est ajoutée qu'à droite
+            limits.append((low if k == 0 else low - self.headroom * span, high + self.headroom * span))
+        self.limits = limits
+        x_limits, price_limits, pnl_limits = limits
+        for ax, y_limits in zip(self.axes, (price_limits, pnl_limits)):
+            ax.set_xlim(*x_limits)
+            ax.set_ylim(*y_limits)
+
+    def _within_limits(self, needed):
+        if self.limits is None:
+            return False
+        return all(limits[0] <= low and high <= limits[1] for (low, high), limits in zip(needed, self.limits))
+
+    def render(self):
+        needed = self._needed_limits()
+        full_redraw = not self._within_limits(needed)
+        if full_redraw:
+            self._expand_limits(needed)
+
+        # Réduction incrémentale : seuls les ticks arrivés depuis l'image précédente sont lus
+        max_buckets = max(int(self.axes[0].bbox.width), 100)
+        x, price, pnl = self.x.view(), self.price.view(), self.pnl.view()
+        for points, y in ((self.price_points, price), (self.pnl_points, pnl)):
+            points.max_buckets = max_buckets
+            points.update(y)
+        index = self.price_points.indices()
+        self.price_line.set_data(x[index], price[index])
+        index = self.pnl_points.indices()
+        pnl_x, pnl_y = x[index], pnl[index]
+        self.pnl_line.set_data(pnl_x, pnl_y)
+        self.pnl_positive.set_verts([_area(pnl_x, pnl_y, 1)])
+        self.pnl_negative.set_verts([_area(pnl_x, pnl_y, -1)])
+        self.buy_markers.set_data(self.buy_x.view(), self.buy_y.view())
+        self.sell_markers.set_data(self.sell_x.view(), self.sell_y.view())
+
+        if not self.blit:
+            self.canvas.draw_idle()
+        else:
+            if full_redraw or self.background is None:
+                self.canvas.draw()  # Déclenche la capture du fond (artistes animés exclus)
+            for ax, background in zip(self.axes, self.background):
+                self.canvas.restore_region(background)
+            for ax, artist in self.artists:
+                ax.draw_artist(artist)
+            for ax in self.axes:
+                self.canvas.blit(ax.bbox)
+        self.drawn = self.x.size
+        self.frames += 1
@@ -0,0 +1,186 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Couche d'accès aux données de marché :
+# - YahooProvider : yfinance (importé seulement à l'usage)
+# - OfflineProvider : fichiers enregistrés ou OHLCV synthétique, pour tourner sans réseau
+# - CachedProvider : cache disque par (ticker, intervalle, période), seules les périodes manquantes sont téléchargées
+# - fetch_many : téléchargement concurrent d'une liste de tickers
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+def _day(value):
+    day = pd.Timestamp(value)
+    if day.tzinfo is not None:
+        day = day.tz_localize(None)
+    return day.normalize()
+
+def _naive_index(data):
+    # Index en heure locale sans fuseau (barres intrajournalières tz-aware de yfinance), comparable aux bornes _day
+    index = data.index
+    return index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+
+class YahooProvider:
+    def fetch(self, ticker, start, end, interval="1d"):
+        import yfinance as yf
+        data = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+        # Versions récentes de yfinance : colonnes (Price, Ticker) même pour un seul ticker
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data.droplevel("Ticker", axis=1) if "Ticker" in data.columns.names else data.droplevel(1, axis=1)
+        return data
+
+class OfflineProvider:
+    # <root>/<ticker>.csv (ou .pkl) si présent, sinon série synthétique reproductible (GBM + volume)
+    def __init__(self, root=None, synthetic=True, seed=0, drift=0.05, volatility=0.25, origin="2000-01-03"):
+        self.root = root
+        self.synthetic = synthetic
+        self.seed = seed
+        self.drift = drift
+        self.volatility = volatility
+        self.origin = pd.Timestamp(origin)
+
+    def recorded(self, ticker):
+        for extension, reader in ((".pkl", pd.read_pickle), (".csv", lambda p: pd.read_csv(p, index_col=0, parse_dates=True))):
+            path = os.path.join(self.root, ticker + extension) if self.root else None
+            if path and os.path.isfile(path):
+                return reader(path)
+        return None
+
+    def fetch(self, ticker, start, end, interval="1d"):
+        data = self.recorded(ticker)
+        if data is None:
+            if not self.synthetic:
+                raise KeyError(f"Pas de données enregistrées pour {ticker}")
+            if interval != "1d":
+                raise ValueError("Données synthétiques disponibles uniquement en 1d")
+            data = synthetic_ohlcv(ticker, self.origin, _day(end), self.seed, self.drift, self.volatility)
+        return data[(data.index >= _day(start)) & (data.index < _day(end))]
+
+def synthetic_ohlcv(ticker, start, end, seed=0, drift=0.05, volatility=0.25, start_price=100.0):
+    # Trajectoire générée depuis une origine fixe : deux requêtes qui se chevauchent renvoient les mêmes valeurs
+    dates = pd.bdate_range(start, end, inclusive="left", name="Date")
+    rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+    n = len(dates)
+    dt = 1 / 252
+    # Un tirage par jour (ligne) : la valeur d'un jour ne dépend pas de la longueur demandée
+    z = rng.standard_normal((n, 4))
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + volatility * np.sqrt(dt) * z[:, 0]
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate([[start_price], close[:-1]]) * np.exp(0.1 * volatility * np.sqrt(dt) * z[:, 1])
+    spread = np.abs(z[:, 2]) * volatility * np.sqrt(dt) * 0.5
+    high = np.maximum(open_, close) * np.exp(spread)
+    low = np.minimum(open_, close) * np.exp(-spread)
+    volume = np.exp(15 + 0.4 * z[:, 3]).astype(np.int64)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Adj Close": close, "Volume": volume}, index=dates)
+
+class CachedProvider:
+    def __init__(self, provider, cache_dir="data/cache"):
+        self.provider = provider
+        self.cache_dir = cache_dir
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _index_path(self, ticker, interval):
+        name = hashlib.sha1(f"{ticker}|{interval}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _chunk_path(self, ticker, interval, start, end):
+        # Nom de fichier = empreinte de la clé (ticker, intervalle, période)
+        name = hashlib.sha1(f"{ticker}|{interval}|{start.date()}|{end.date()}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def missing_ranges(self, chunks, start, end):
+        gaps, cursor = [], start
+        for chunk_start, chunk_end in sorted((pd.Timestamp(c["start"]), pd.Timestamp(c["end"])) for c in chunks):
+            if chunk_end <= cursor:
+                continue
+            if chunk_start >= end:
+                break
+            if chunk_start > cursor:
+                gaps.append((cursor, chunk_start))
+            cursor = max(cursor, chunk_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def fetch(self, ticker, start, end, interval="1d"):
+        start, end = _day(start), _day(end)
+        # La journée en cours n'est jamais mise en cache (barre incomplète)
+        today = pd.Timestamp.today().normalize()
+        with self._lock((ticker, interval)):
+            index_path = self._index_path(ticker, interval)
+            chunks = []
+            if os.path.isfile(index_path):
+                with open(index_path, encoding="utf-8") as f:
+                    chunks = json.load(f)
+
+            fresh = []
+            try:
+                for gap_start, gap_end in self.missing_ranges(chunks, start, end):
+                    data = self.provider.fetch(ticker, gap_start, gap_end, interval)
+                    cache_end = min(gap_end, today)
+                    if data is None or not len(data):
+                        # Période entièrement passée sans barre (week-end, jour férié, avant la cotation) : enregistrée sans fichier.
+                        # Réponse vide touchant aujourd'hui (yfinance ne lève pas d'erreur en cas d'échec) : redemandée au prochain appel
+                        if gap_end <= today:
+                            chunks.append({"start": str(gap_start.date()), "end": str(gap_end.date()), "file": None})
+                        continue
+                    index = _naive_index(data)
+                    cached = data[index < cache_end]
+                    if cache_end > gap_start:
+                        # Fournisseur joignable mais aucune barre avant aujourd'hui : période passée enregistrée vide
+                        file = None
+                        if len(cached):
+                            path = self._chunk_path(ticker, interval, gap_start, cache_end)
+                            cached.to_pickle(path)
+                            file = os.path.basename(path)
+                        chunks.append({"start": str(gap_start.date()), "end": str(cache_end.date()), "file": file})
+                    fresh.append(data[index >= cache_end])
+            finally:
+                # Périodes déjà téléchargées conservées même si une requête suivante échoue
+                with open(index_path, "w", encoding="utf-8") as f:
+                    json.dump(chunks, f)
+
+        frames = [pd.read_pickle(os.path.join(self.cache_dir, c["file"])) for c in chunks
+                  if c["file"] and pd.Timestamp(c["start"]) < end and pd.Timestamp(c["end"]) > start]
+        frames += [f for f in fresh if len(f)]
+        if not frames:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        data = pd.concat(frames).sort_index()
+        data = data[~data.index.duplicated(keep="last")]
+        index = _naive_index(data)
+        return data[(index >= start) & (index < end)]
+
+def default_provider(offline=None, cache_dir="data/cache", offline_root=None):
+    # ALGOTRADE_OFFLINE=1 : toute la chaîne tourne sans réseau (données enregistrées ou synthétiques)
+    if offline is None:
+        offline = os.environ.get("ALGOTRADE_OFFLINE", "") not in ("", "0")
+    source = OfflineProvider(offline_root or os.environ.get("ALGOTRADE_OFFLINE_DIR")) if offline else YahooProvider()
+    return CachedProvider(source, cache_dir) if cache_dir else source
+
+def fetch_many(provider, tickers, start, end, interval="1d", max_workers=8):
+    # Téléchargements concurrents bornés ; les tickers en erreur sont signalés sans interrompre les autres
+    results = {}
+    def fetch(ticker):
+        try:
+            return ticker, provider.fetch(ticker, start, end, interval), None
+        except Exception as e:
+            return ticker, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for ticker, data, error in executor.map(fetch, tickers):
+            if error is not None:
+                print(f"Erreur de téléchargement pour {ticker} : {error}")
+                continue
+            results[ticker] = data
+    return results
@@ -1,132 +1,227 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import animation
 from datetime import datetime, timedelta
 import time
+import threading
+from streaming_indicators import SMA, RSI
+from csv_follower import CsvFollower
+from latency import LatencyProfiler, install_signal_toggle
 
 # Paramètres d'initialisation
 fichier_csv = "../data/flux_financier.csv"
 start_date = datetime(2023, 12, 31) - timedelta(days=2 * 365)
-
-# Calcul des indicateurs techniques
-def calculate_sma(price_series, N):
-    return price_series.rolling(window=N).mean().iloc[-1]
-
-def calculate_rsi(price_series, N):
-    delta = price_series.diff()
-    gain = delta.where(delta > 0, 0).rolling(window=N).mean().iloc[-1]
-    loss = -delta.where(delta < 0, 0).rolling(window=N).mean().iloc[-1]
-    rs = gain / loss if loss != 0 else np.inf
-    return 100 - (100 / (1 + rs))
-
-def traiter_donnees(fichier_csv):
-    # Initialisation des variables pour le traitement
-    position = 0
-    PnL = 0
-    cumulative_pnl = 0
-    buy_price = 0
-    max_price = 0
-    timestamps, close, pnl = [], [], []
-    buy_time, buy_signal, sell_time, sell_signal = [], [], [], []
-    prices = []
-
-    # Préparer les graphiques
-    fig, axes = plt.subplots(1, 2, figsize=(14, 7))
-
-    def draw_graph(i):
+profiling = None  # True / False ; None : variable d'environnement ALGOTRADE_PROFILE
+trace_file = "../data/latency_trace.json"  # Trace exportée à l'arrêt si des mesures ont été faites
+chart_mode = "blit"  # "blit" : graphique incrémental (live_chart) ; "full" : redessin complet à chaque paquet ; None : sans graphique
+max_fps = 10  # Cadence maximale du graphique incrémental, indépendante du traitement des ticks
+chart_ticker = None  # Ticker affiché quand le flux en contient plusieurs (colonne TICKER) ; None : premier ticker reçu
+
+class LiveStrategy:
+    # Stratégie du flux temps réel (SMA 5 jours + RSI), appelée une fois par tick
+    def __init__(self, start_date=start_date):
+        self.start_date = start_date
+        # Initialisation des variables pour le traitement
+        self.position = 0
+        self.cumulative_pnl = 0
+        self.buy_price = 0
+        self.max_price = 0
+        self.timestamps, self.close, self.pnl = [], [], []
+        self.buy_time, self.buy_signal, self.sell_time, self.sell_signal = [], [], [], []
+
+        # Indicateurs incrémentaux : coût constant par tick
+        self.sma_5 = SMA(5)
+        # Équivalent de l'ancien calcul pandas sur les 25 derniers prix, qui n'utilisait que 24 écarts
+        self.rsi_25 = RSI(24)
+
+    def on_tick(self, date, price):
+        # Prix manquant (cellule vide du flux, lue comme NaN) : tick ignoré
+        if date < self.start_date or price != price:
+            return
+        sma, rsi = self.update_indicators(date, price)
+        self.decide(date, price, sma, rsi)
+
+    def update_indicators(self, date, price):
+        # Mise à jour des listes
+        self.timestamps.append(date)
+        self.close.append(price)
+
+        # Calcul des indicateurs (RSI disponible à partir de 25 prix, comme avant)
+        sma = self.sma_5.update(price)
+        rsi = self.rsi_25.update(price)
+        if len(self.close) < 25:
+            rsi = None
+        return sma, rsi
+
+    def decide(self, date, price, sma, rsi):
+        if sma is not None:
+            # Logique de trading
+            if self.position == 0 and price > sma and rsi is not None and rsi <= 40:
+                self.position = 1
+                self.buy_price = price
+                self.max_price = price
+                self.buy_time.append(date)
+                self.buy_signal.append(price)
+            elif self.position == 1 and (price < sma or (rsi is not None and rsi >= 70) or price <= self.max_price * 0.95):
+                self.position = 0
+                self.sell_time.append(date)
+                self.sell_signal.append(price)
+                self.cumulative_pnl += price - self.buy_price
+                self.max_price = 0
+
+        # Mise à jour du PnL
+        if self.position == 1:
+            PnL = price - self.buy_price
+        else:
+            PnL = self.cumulative_pnl
+
+        self.pnl.append(PnL)
+
+def profiled_tick(strategy, profiler, date, price, received):
+    # Même traitement que on_tick, avec le temps passé dans chaque étape et la latence depuis la lecture du fichier
+    if date < strategy.start_date or price != price:
+        return
+    start = profiler.now()
+    sma, rsi = strategy.update_indicators(date, price)
+    start = profiler.lap("indicators", start)
+    strategy.decide(date, price, sma, rsi)
+    end = profiler.lap("signal", start)
+    if received and end:
+        profiler.record("tick_to_decision", received, end)
+
+def traiter_donnees(fichier_csv, profiler=None, headless=False):
+    # Une stratégie (indicateurs, position, PnL) par ticker : un flux multi-tickers (Simu_real_time) ne mélange pas les séries
+    strategies = {}
+    tickers = []  # ordre d'arrivée, lu par le graphique sans parcourir le dictionnaire pendant qu'il grandit
+    def strategy_for(ticker):
+        strategy = strategies.get(ticker)
+        if strategy is None:
+            strategy = strategies[ticker] = LiveStrategy()
+            tickers.append(ticker)
+        return strategy
+
+    def charted():
+        if chart_ticker is not None:
+            return strategies.get(chart_ticker)
+        return strategies[tickers[0]] if tickers else None
+
+    profiler = profiler or LatencyProfiler(profiling)
+    install_signal_toggle(profiler)
+
+    # Préparer les graphiques (headless : ni matplotlib ni fenêtre, seuls les ticks sont traités)
+    fig = chart = None
+    if not headless and chart_mode is not None:
+        import matplotlib.pyplot as plt
+        from live_chart import LiveChart
+        fig, axes = plt.subplots(1, 2, figsize=(14, 7))
+        # Cadence fixée par le minuteur du graphique (max_fps), pas par LiveChart
+        chart = LiveChart(fig, axes, max_fps=0) if chart_mode == "blit" else None
+        plt.show(block=False)
+
+    def draw_graph(strategy):
+        # Instantané : les listes continuent de grandir dans le fil de traitement des ticks
+        n = len(strategy.pnl)
+        timestamps, close, pnl = strategy.timestamps[:n], strategy.close[:n], np.array(strategy.pnl[:n])
+        buys = min(len(strategy.buy_time), len(strategy.buy_signal))
+        sells = min(len(strategy.sell_time), len(strategy.sell_signal))
         axes[0].cla()
         axes[1].cla()
         
-        axes[0].scatter(buy_time, buy_signal, marker='^', color='green', label='Buy Signal', s=100)
-        axes[0].scatter(sell_time, sell_signal, marker='v', color='red', label='Sell Signal', s=100)
+        axes[0].scatter(strategy.buy_time[:buys], strategy.buy_signal[:buys], marker='^', color='green', label='Buy Signal', s=100)
+        axes[0].scatter(strategy.sell_time[:sells], strategy.sell_signal[:sells], marker='v', color='red', label='Sell Signal', s=100)
         axes[0].plot(timestamps, close, label='Close price')
         axes[0].set_title("Intersection between Close price and SMA 5 days with buy or sell indicator")
         axes[0].set_xlabel("Date")
         axes[0].set_ylabel("Price")
         axes[0].legend(loc='upper left')
 
-        axes[1].fill_between(timestamps, pnl, where=(np.array(pnl) >= 0), color='green', alpha=0.3)
-        axes[1].fill_between(timestamps, pnl, where=(np.array(pnl) < 0), color='red', alpha=0.3)
+        axes[1].fill_between(timestamps, pnl, where=(pnl >= 0), color='green', alpha=0.3)
+        axes[1].fill_between(timestamps, pnl, where=(pnl < 0), color='red', alpha=0.3)
         axes[1].plot(timestamps, pnl, label='Cumulative PnL')
         axes[1].set_xlabel("Date")
         axes[1].set_ylabel("PnL")
         axes[1].set_title("PnL over time")
         axes[1].legend(loc='upper left')
 
-    last_processed_row = 0  # Indicateur de la dernière ligne traitée
-
-    while True:
-        try:
-            df = pd.read_csv(fichier_csv)
-
-            # Vérifier si la colonne 'Date' existe
-            if 'date' not in df.columns:
-                raise KeyError("'Date' column not found in the CSV file.")
-
-            # Convertir la colonne 'Date' en datetime
-            df['date'] = pd.to_datetime(df['date'])
-
-            # Ne traiter que les nouvelles lignes
-            new_rows = df.iloc[last_processed_row:]
-
-            if new_rows.empty:
-                print("Aucune nouvelle ligne à traiter.")
-            else:
-                for _, row in new_rows.iterrows():
-                    date = row['date']
-                    price = row['PRC']
-
-                    if date < start_date:
-                        continue
-
-                    # Mise à jour des listes
-                    timestamps.append(date)
-                    close.append(price)
-                    prices.append(price)
-
-                    # Calcul des indicateurs si assez de données
-                    if len(prices) >= 5:
-                        sma = calculate_sma(pd.Series(prices[-5:]), 5)
-                        rsi = calculate_rsi(pd.Series(prices[-25:]), 25) if len(prices) >= 25 else None
-
-                        # Logique de trading
-                        if position == 0 and price > sma and rsi is not None and rsi <= 40:
-                            position = 1
-                            buy_price = price
-                            max_price = price
-                            buy_time.append(date)
-                            buy_signal.append(price)
-                        elif position == 1 and (price < sma or (rsi is not None and rsi >= 70) or price <= max_price * 0.95):
-                            position = 0
-                            sell_time.append(date)
-                            sell_signal.append(price)
-                            cumulative_pnl += price - buy_price
-                            max_price = 0
-
-                    # Mise à jour du PnL
-                    if position == 1:
-                        PnL = price - buy_price
+    def refresh():
+        # Minuteur du graphique (fil principal) : lit l'état des stratégies, ne bloque jamais le traitement des ticks
+        strategy = charted()
+        if strategy is None:
+            return
+        start = profiler.now()
+        if chart is not None:
+            drawn = chart.update(strategy)
+        else:
+            draw_graph(strategy)
+            fig.canvas.draw_idle()
+            drawn = True
+        if drawn:
+            profiler.lap("draw", start)
+
+    # Touche "p" dans la fenêtre du graphique : active / désactive la mesure des latences
+    if fig is not None:
+        fig.canvas.mpl_connect('key_press_event', lambda event: profiler.toggle() if event.key == 'p' else None)
+
+    # Lecteur incrémental : seules les lignes ajoutées depuis le dernier passage sont lues
+    reader = CsvFollower(fichier_csv, profiler=profiler)
+    stop = threading.Event()
+
+    def process_ticks():
+        while not stop.is_set():
+            try:
+                # Bloque jusqu'à l'arrivée de nouvelles lignes (attente adaptative) ; paquets vides : arrêt vérifié pendant les pauses du flux
+                for new_rows in reader.follow(min_interval=0.01, max_interval=0.5, yield_empty=True):
+                    if stop.is_set():
+                        return
+                    # Vérifier si la colonne 'Date' existe
+                    if reader.header is not None and 'date' not in reader.header:
+                        raise KeyError("'Date' column not found in the CSV file.")
+
+                    # Sans colonne TICKER : une seule stratégie (clé None)
+                    if profiler.enabled:
+                        for row in new_rows:
+                            profiled_tick(strategy_for(row.get('TICKER')), profiler, row['date'], row['PRC'], reader.polled_at)
                     else:
-                        PnL = cumulative_pnl
-
-                    pnl.append(PnL)
-
-                # Mettre à jour l'indicateur de la dernière ligne traitée
-                last_processed_row = len(df)
-
-                # Animation du graphique
-                draw_graph(0)  # Redessiner le graphique après chaque ligne traitée
-                plt.pause(0.1)  # Pause pour permettre à l'animation de se mettre à jour
-
-        except FileNotFoundError:
-            print("Fichier CSV introuvable.")
-        except KeyError as e:
-            print(f"Erreur de colonne : {e}")
-        except Exception as e:
-            print(f"Erreur : {e}")
-
-        time.sleep(0.5)  # Attendre 4 secondes avant de relire le fichier et traiter les nouvelles lignes
+                        for row in new_rows:
+                            strategy_for(row.get('TICKER')).on_tick(row['date'], row['PRC'])
+                    profiler.maybe_report()
+
+            except FileNotFoundError:
+                print("Fichier CSV introuvable.")
+            except KeyError as e:
+                print(f"Erreur de colonne : {e}")
+            except Exception as e:
+                print(f"Erreur : {e}")
+
+            stop.wait(0.5)  # Attendre avant de réessayer après une erreur
+
+    try:
+        if fig is None:
+            process_ticks()
+        else:
+            # Ticks traités dans un fil dédié, graphique rafraîchi par un minuteur de l'interface (au plus max_fps images/s) :
+            # un redessin complet (élargissement des axes, redimensionnement) retarde l'image suivante, pas les ticks
+            worker = threading.Thread(target=process_ticks, name="ticks", daemon=True)
+            worker.start()
+            timer = fig.canvas.new_timer(interval=int(1000 / max_fps) if max_fps else 100)
+            timer.add_callback(refresh)
+            timer.start()
+            try:
+                # Boucle d'événements de l'interface jusqu'à la fermeture de la fenêtre
+                while worker.is_alive() and plt.fignum_exists(fig.number):
+                    fig.canvas.start_event_loop(0.5)
+            finally:
+                timer.stop()
+    finally:
+        stop.set()
+        # Arrêt (Ctrl+C, fermeture) : dernier résumé et export de la trace
+        if fig is None:
+            for ticker, strategy in strategies.items():
+                label = f"{ticker} : " if ticker is not None else ""
+                print(f"{label}{len(strategy.timestamps)} ticks traités | Position = {strategy.position} | PnL = {strategy.pnl[-1] if strategy.pnl else 0:.2f}")
+        if profiler.histograms:
+            print(profiler.summary())
+            if trace_file:
+                print(f"Trace des latences : {profiler.export_trace(trace_file)} événements dans {trace_file}")
 
 if __name__ == "__main__":
     traiter_donnees(fichier_csv)
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Rendu des graphes de paires corrélées : backend sans affichage, processus parallèles,
+# séries longues réduites avant le tracé et PNG à jour non redessinés (empreinte des données + paramètres).
+MANIFEST = "render_manifest.json"
+
+def downsample_minmax(x, y, max_points):
+    # Garde le min et le max de chaque paquet : les extrêmes restent visibles sur le graphe
+    if max_points < 2:
+        raise ValueError(f"max_points doit valoir au moins 2 (un min et un max par paquet), reçu {max_points}")
+    if len(y) <= max_points:
+        return x, y
+    bucket = int(np.ceil(len(y) / (max_points // 2)))
+    n_buckets = int(np.ceil(len(y) / bucket))
+    padded = np.full(n_buckets * bucket, np.nan)
+    padded[:len(y)] = y
+    blocks = padded.reshape(n_buckets, bucket)
+    offsets = np.arange(n_buckets) * bucket
+    index = np.unique(np.concatenate([offsets + np.nanargmin(blocks, axis=1), offsets + np.nanargmax(blocks, axis=1)]))
+    return x[index], y[index]
+
+def pair_fingerprint(x1, y1, x2, y2, params):
+    h = hashlib.sha1()
+    for array in (x1, y1, x2, y2):
+        h.update(np.ascontiguousarray(array).tobytes())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()
+
+def _render(task):
+    # Figure sans pyplot : rendu Agg propre à la figure, le backend du processus appelant (mode séquentiel) n'est pas modifié
+    from matplotlib.figure import Figure
+
+    path, ticker1, ticker2, corr_value, (x1, y1), (x2, y2), dpi = task
+    fig = Figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    ax.plot(x1.astype("datetime64[ns]"), y1, label=ticker1, alpha=0.7)
+    ax.plot(x2.astype("datetime64[ns]"), y2, label=ticker2, alpha=0.7)
+
+    ax.set_title(f'Prix des actions : {ticker1} et {ticker2}')
+    fig.suptitle(f'Coefficient de corrélation : {corr_value:.2f}', fontsize=10)
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Prix')
+    ax.legend()
+    ax.grid()
+    fig.savefig(path, dpi=dpi)
+    return path
+
+def render_pair_charts(price_df, pairs, output_dir, n_jobs=None, max_points=2000, dpi=200, force=False):
+    # pairs : itérable de (ticker1, ticker2, corrélation), par exemple extract_pairs(...)[PAIR_COLUMNS].itertuples(index=False)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    dates = price_df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    tasks, skipped = [], 0
+    for ticker1, ticker2, corr_value in pairs:
+        series = []
+        for ticker in (ticker1, ticker2):
+            y = price_df[ticker].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(y)
+            series.append((dates[valid], y[valid]))
+        name = f'{ticker1}_{ticker2}.png'
+        path = os.path.join(output_dir, name)
+        params = {"corr": f"{corr_value:.2f}", "max_points": max_points, "dpi": dpi}
+        fingerprint = pair_fingerprint(*series[0], *series[1], params)
+        if not force and manifest.get(name) == fingerprint and os.path.isfile(path):
+            skipped += 1
+            continue
+        manifest[name] = fingerprint
+        series = [downsample_minmax(x, y, max_points) for x, y in series]
+        tasks.append((path, ticker1, ticker2, corr_value, series[0], series[1], dpi))
+
+    if tasks:
+        if n_jobs == 1 or len(tasks) == 1:
+            for task in tasks:
+                _render(task)
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(_render, tasks, chunksize=max(1, len(tasks) // (4 * (n_jobs or os.cpu_count())))))
+
+    # Manifeste écrit après le rendu : un rendu interrompu sera refait au prochain lancement
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    print(f"Graphes : {len(tasks)} dessinés, {skipped} déjà à jour")
+    return len(tasks), skipped
@@ -0,0 +1,130 @@
+import math
+import numpy as np
+
+# Recherche des paramètres (EMA court, EMA long, RSI, signal) avec un budget fixe de backtests,
+# au lieu du parcours complet de la grille.
+# evaluate(combinations, end=None) -> [(ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade), ...]
+# end : longueur du préfixe de données utilisé (None : série complète). Chaque combinaison évaluée compte pour 1 dans le budget.
+
+def _sample(candidates, size, rng):
+    # Tirage sans remise, remis dans l'ordre d'énumération (les fenêtres communes restent proches pour le cache)
+    index = np.sort(rng.choice(len(candidates), size=min(size, len(candidates)), replace=False))
+    return [candidates[i] for i in index]
+
+def _ranked(results):
+    # Tri stable par PnL décroissant, comme grid_search
+    return sorted(results, key=lambda x: x[4], reverse=True)
+
+def warmup_bars(candidates):
+    # Nombre de barres avant le premier signal possible pour la combinaison la plus lente
+    return max(max(short, long, rsi) + signal for short, long, rsi, signal in candidates)
+
+def random_search(candidates, evaluate, budget, n_bars, rng):
+    return _ranked(evaluate(_sample(candidates, budget, rng)))
+
+def successive_halving(candidates, evaluate, budget, n_bars, rng, eta=3, min_bars=None):
+    # Toutes les combinaisons tirées sont évaluées sur un court préfixe de l'historique,
+    # le meilleur tiers (1/eta) passe au préfixe suivant, eta fois plus long, jusqu'à la série complète.
+    min_bars = min_bars or max(n_bars // eta ** 2, 2 * warmup_bars(candidates))
+    rungs = 1 + max(0, int(math.floor(math.log(n_bars / min_bars, eta)))) if min_bars < n_bars else 1
+    lengths = [n_bars // eta ** (rungs - 1 - r) for r in range(rungs)]
+    # Coût total : n0 * (1 + 1/eta + 1/eta² + ...) <= budget
+    n0 = max(1, int(budget / sum(eta ** -r for r in range(rungs))))
+    survivors = _sample(candidates, n0, rng)
+
+    for rung, length in enumerate(lengths):
+        results = _ranked(evaluate(survivors, None if rung == rungs - 1 else length))
+        if rung == rungs - 1:
+            return results
+        survivors = sorted(r[:4] for r in results[:max(1, len(results) // eta)])
+
+def _parzen(values, observed, bandwidth, prior_weight=1.0):
+    # Densité discrète : a priori uniforme + noyau gaussien autour de chaque valeur observée (en rang)
+    weights = np.full(len(values), prior_weight / len(values))
+    if len(observed):
+        positions = np.searchsorted(values, observed)
+        distance = np.arange(len(values))[:, None] - positions[None, :]
+        weights = weights + np.exp(-0.5 * (distance / bandwidth) ** 2).sum(axis=1)
+    return weights / weights.sum()
+
+def tpe_search(candidates, evaluate, budget, n_bars, rng, n_startup=None, gamma=0.25, n_ei=24, batch=8, prune_at=0.5):
+    # TPE (Tree-structured Parzen Estimator) simplifié sur les 4 dimensions discrètes :
+    # les essais sont séparés en "bons" (quantile gamma des PnL) et "mauvais", et chaque nouvel essai maximise
+    # le rapport des densités l(x)/g(x) parmi n_ei tirages selon l(x).
+    # Élagage : chaque essai est d'abord évalué sur le préfixe prune_at de l'historique et n'est poursuivi
+    # que si son PnL partiel atteint la médiane des essais précédents au même point.
+    grid = np.array(candidates)
+    dims = [np.unique(grid[:, d]) for d in range(grid.shape[1])]
+    bandwidths = [max(1.0, 0.1 * len(v)) for v in dims]
+    valid = set(map(tuple, candidates))
+    tried = set()
+    prefix = int(n_bars * prune_at) if prune_at else None
+    if prefix is not None and prefix <= warmup_bars(candidates):
+        prefix = None
+    n_startup = n_startup or max(10, budget // 5)
+
+    completed, pruned, partial = [], [], []
+    used = 0
+
+    def propose(size):
+        if len(completed) < n_startup or len(completed) < 2:
+            pool = [c for c in _sample(candidates, size + len(tried), rng) if c not in tried]
+            return pool[:size]
+        ranked = _ranked(completed)
+        n_good = max(1, int(math.ceil(gamma * len(ranked))))
+        good = np.array([r[:4] for r in ranked[:n_good]])
+        bad = np.array([r[:4] for r in ranked[n_good:]] + pruned).reshape(-1, 4)
+        log_ratio, draws = 0.0, []
+        for d, values in enumerate(dims):
+            l = _parzen(values, good[:, d], bandwidths[d])
+            g = _parzen(values, bad[:, d], bandwidths[d])
+            index = rng.choice(len(values), size=n_ei * size, p=l)
+            draws.append(values[index])
+            log_ratio = log_ratio + np.log(l[index]) - np.log(g[index])
+        proposals = []
+        for k in np.argsort(-log_ratio, kind="stable"):
+            combination = tuple(int(draws[d][k]) for d in range(len(dims)))
+            if combination in valid and combination not in tried and combination not in proposals:
+                proposals.append(combination)
+                if len(proposals) == size:
+                    break
+        if len(proposals) < size:
+            # Densités trop concentrées : complément par tirage aléatoire
+            extra = [c for c in _sample(candidates, size + len(tried) + len(proposals), rng) if c not in tried and c not in proposals]
+            proposals += extra[:size - len(proposals)]
+        return proposals
+
+    while used < budget and len(tried) < len(candidates):
+        combinations = propose(min(batch, budget - used))
+        if not combinations:
+            break
+        tried.update(combinations)
+        survivors = combinations
+        if prefix is not None:
+            results = evaluate(sorted(combinations), prefix)
+            used += len(results)
+            threshold = np.median(partial) if len(completed) >= n_startup and partial else -np.inf
+            partial += [r[4] for r in results]
+            survivors = sorted(r[:4] for r in results if r[4] >= threshold)
+            pruned += [list(r[:4]) for r in results if r[4] < threshold]
+            survivors = survivors[:max(0, budget - used)]
+        if survivors:
+            results = evaluate(survivors)
+            used += len(results)
+            completed += results
+
+    return _ranked(completed)
+
+SEARCHES = {
+    "random": random_search,
+    "halving": successive_halving,
+    "tpe": tpe_search,
+}
+
+def run_search(search, candidates, evaluate, budget, n_bars, seed=0, **options):
+    if search not in SEARCHES:
+        raise ValueError(f"Recherche inconnue : {search} (grid, {', '.join(SEARCHES)})")
+    candidates = list(candidates)
+    budget = budget or max(1, len(candidates) // 10)  # Par défaut : 10 % de la grille
+    rng = np.random.default_rng(seed)
+    return SEARCHES[search](candidates, evaluate, budget, n_bars, rng, **options)
@@ -0,0 +1,285 @@
+import time
+import heapq
+import math
+from array import array
+from itertools import repeat
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+from streaming_indicators import MACD, RSI
+from Momentum_opti import rsi_high, rsi_low
+
+# Backtest de portefeuille piloté par événements : les flux de barres de chaque ticker sont fusionnés par date
+# avec un tas (heapq.merge), chaque barre passe par le même callback que le flux temps réel (EventEngine.on_bar).
+# État du portefeuille dans des tableaux indexés par ticker (titres, prix d'entrée, dernier prix),
+# journaux des trades et de la courbe de capital dans des colonnes typées (array) plutôt que des listes d'objets.
+# Événement : (date en ns int64, indice du ticker, prix) ; à date égale, ordre des tickers.
+
+def bar_stream(index, dates, prices, chunk_size=4096):
+    # Flux d'un ticker converti par paquets : seules des valeurs Python natives traversent le tas, prix manquants ignorés
+    dates = np.asarray(dates, dtype="datetime64[ns]").view(np.int64)
+    for start in range(0, len(dates), chunk_size):
+        block = np.asarray(prices[start:start + chunk_size], dtype=np.float64)
+        valid = ~np.isnan(block)
+        yield from zip(dates[start:start + chunk_size][valid].tolist(), repeat(index), block[valid].tolist())
+
+def universe_streams(universe):
+    # universe : DataFrame (dates x tickers), par exemple price_store.load_universe_matrix
+    dates = universe.index.to_numpy()
+    return [bar_stream(k, dates, universe[ticker].to_numpy()) for k, ticker in enumerate(universe.columns)]
+
+def store_streams(tickers, start=None, end=None, store_dir=None, workbook=None):
+    # Un flux par ticker lu dans le store colonne (memmap) : les séries ne sont pas alignées sur un index commun
+    from price_store import iter_universe
+    return [bar_stream(k, arrays["date"], arrays["PRC"])
+            for k, (ticker, arrays) in enumerate(iter_universe(tickers, start, end, ["PRC"], store_dir, workbook))]
+
+class MomentumStrategy:
+    # Règles de apply_strategy_numpy (MACD / ligne de signal + RSI) avec un état incrémental par ticker :
+    # on_bar(index, price) -> 1 achat, -1 vente, 0 rien
+    def __init__(self, n_tickers, ema_short_window=5, ema_long_window=23, rsi_window=13, window_signal=13):
+        self.start = max(ema_short_window, ema_long_window)
+        self.macd = [MACD(ema_short_window, ema_long_window, window_signal) for _ in range(n_tickers)]
+        self.rsi = [RSI(rsi_window) for _ in range(n_tickers)]
+        self.count = [0] * n_tickers
+
+    def on_bar(self, index, price):
+        macd = self.macd[index].update(price)
+        rsi = self.rsi[index].update(price)
+        count = self.count[index]
+        self.count[index] = count + 1
+        if count < self.start or macd is None or rsi is None:
+            return 0
+        value, signal, _ = macd
+        if value > signal and rsi < rsi_low:
+            return 1
+        if value < signal and rsi > rsi_high:
+            return -1
+        return 0
+
+class Portfolio:
+    # allocation : part du capital (valorisé à la dernière date close) engagée par position
+    # quantity : nombre fixe de titres par achat (remplace allocation), réduit si la trésorerie ne suffit pas
+    # cost_bps : frais proportionnels (commission + glissement) en points de base, commission : frais fixes par ordre
+    def __init__(self, tickers, cash=1_000_000.0, allocation=0.05, quantity=None, cost_bps=5.0, commission=0.0,
+                 max_positions=None, whole_shares=True):
+        self.tickers = list(tickers)
+        n = len(self.tickers)
+        self.initial_cash = cash
+        self.cash = cash
+        self.allocation = allocation
+        self.quantity = quantity
+        self.cost_rate = cost_bps / 1e4
+        self.commission = commission
+        self.max_positions = max_positions or n
+        self.whole_shares = whole_shares
+
+        self.shares = np.zeros(n)
+        self.entry_price = np.zeros(n)
+        self.entry_cost = np.zeros(n)
+        self.last_price = np.full(n, np.nan)
+        self.open_positions = 0
+        self.costs = 0.0
+        self.events = 0
+
+        # Capital en fin de chaque date (sert au dimensionnement des ordres de la date suivante)
+        self.ts = None
+        self.equity = cash
+        self.equity_time = array('q')
+        self.equity_value = array('d')
+        self.trade_time = array('q')
+        self.trade_ticker = array('q')
+        self.trade_side = array('b')
+        self.trade_shares = array('d')
+        self.trade_price = array('d')
+        self.trade_cost = array('d')
+        self.trade_pnl = array('d')
+
+    def market_value(self):
+        return float(np.dot(self.shares, np.nan_to_num(self.last_price)))
+
+    def mark(self, ts, index, price):
+        if ts != self.ts:
+            if self.ts is not None:
+                self.close_period()
+            self.ts = ts
+        self.last_price[index] = price
+        self.events += 1
+
+    def close_period(self):
+        self.equity = self.cash + self.market_value()
+        self.equity_time.append(self.ts)
+        self.equity_value.append(self.equity)
+
+    def _log(self, ts, index, side, shares, price, cost, pnl):
+        self.trade_time.append(ts)
+        self.trade_ticker.append(index)
+        self.trade_side.append(side)
+        self.trade_shares.append(shares)
+        self.trade_price.append(price)
+        self.trade_cost.append(cost)
+        self.trade_pnl.append(pnl)
+
+    def buy(self, ts, index, price):
+        if self.shares[index] > 0 or self.open_positions >= self.max_positions:
+            return False
+        # Taille cible plafonnée par la trésorerie, frais compris : la trésorerie ne devient jamais négative
+        affordable = (self.cash - self.commission) / (price * (1 + self.cost_rate))
+        target = self.quantity if self.quantity is not None else self.allocation * self.equity / (price * (1 + self.cost_rate))
+        shares = target
+        if affordable < target:
+            shares = affordable
+        if self.whole_shares and (self.quantity is None or shares < target):
+            shares = math.floor(shares)
+        if shares <= 0:
+            return False
+        cost = shares * price * self.cost_rate + self.commission
+        self.cash -= shares * price + cost
+        self.costs += cost
+        self.shares[index] = shares
+        self.entry_price[index] = price
+        self.entry_cost[index] = cost
+        self.open_positions += 1
+        self._log(ts, index, 1, shares, price, cost, 0.0)
+        return True
+
+    def sell(self, ts, index, price):
+        shares = self.shares[index]
+        if shares <= 0:
+            return False
+        cost = shares * price * self.cost_rate + self.commission
+        self.cash += shares * price - cost
+        self.costs += cost
+        # PnL réalisé net des frais d'entrée et de sortie
+        pnl = shares * (price - self.entry_price[index]) - cost - self.entry_cost[index]
+        self.shares[index] = 0.0
+        self.open_positions -= 1
+        self._log(ts, index, -1, shares, price, cost, pnl)
+        return True
+
+    def liquidate(self):
+        # Clôture des positions ouvertes au dernier prix connu de chaque ticker
+        for index in np.flatnonzero(self.shares > 0):
+            self.sell(self.ts, int(index), float(self.last_price[index]))
+
+    def finish(self, liquidate=True):
+        if self.ts is None:
+            return
+        if liquidate:
+            self.liquidate()
+        self.close_period()
+
+    def trades(self):
+        return pd.DataFrame({
+            "date": pd.to_datetime(np.frombuffer(self.trade_time, dtype=np.int64)),
+            "ticker": np.array(self.tickers, dtype=object)[np.frombuffer(self.trade_ticker, dtype=self.trade_ticker.typecode)],
+            "side": np.frombuffer(self.trade_side, dtype=np.int8),
+            "shares": np.frombuffer(self.trade_shares),
+            "price": np.frombuffer(self.trade_price),
+            "cost": np.frombuffer(self.trade_cost),
+            "pnl": np.frombuffer(self.trade_pnl),
+        })
+
+    def equity_curve(self):
+        return pd.Series(np.frombuffer(self.equity_value), index=pd.to_datetime(np.frombuffer(self.equity_time, dtype=np.int64)), name="equity")
+
+    def summary(self):
+        equity = np.frombuffer(self.equity_value)
+        final = self.cash + self.market_value()
+        drawdown = (1 - equity / np.maximum.accumulate(equity)).max() * 100 if len(equity) else 0.0
+        sells = np.frombuffer(self.trade_side, dtype=np.int8) == -1
+        pnl = np.frombuffer(self.trade_pnl)[sells]
+        return {
+            "events": self.events,
+            "final_equity": float(final),
+            "return_pct": float((final / self.initial_cash - 1) * 100),
+            "max_drawdown_pct": float(drawdown),
+            "nb_trade": len(self.trade_side) - int(sells.sum()),
+            "closed_trades": int(sells.sum()),
+            "win_rate_pct": float((pnl > 0).mean() * 100) if len(pnl) else np.nan,
+            "costs": float(self.costs),
+            "open_positions": self.open_positions,
+        }
+
+class EventEngine:
+    # Relie une stratégie (on_bar(index, price) -> signal) à un portefeuille ; même callback en backtest et en direct
+    def __init__(self, strategy, portfolio):
+        self.strategy = strategy
+        self.portfolio = portfolio
+        self.index = {ticker: k for k, ticker in enumerate(portfolio.tickers)}
+        self.elapsed = 0.0
+
+    def on_bar(self, ts, index, price):
+        portfolio = self.portfolio
+        portfolio.mark(ts, index, price)
+        signal = self.strategy.on_bar(index, price)
+        if signal > 0:
+            portfolio.buy(ts, index, price)
+        elif signal < 0:
+            portfolio.sell(ts, index, price)
+        return signal
+
+    def run(self, streams, liquidate=True):
+        # Fusion des flux triés par date : un seul événement par ticker en attente dans le tas
+        on_bar = self.on_bar
+        start = time.perf_counter()
+        for ts, index, price in heapq.merge(*streams):
+            on_bar(ts, index, price)
+        self.portfolio.finish(liquidate)
+        self.elapsed += time.perf_counter() - start
+        return self.portfolio.summary()
+
+    def on_row(self, row, date_column="date", ticker_column="TICKER", price_column="PRC"):
+        # Ligne du flux temps réel (CsvFollower) ; tickers hors portefeuille et prix manquants ignorés
+        index = self.index.get(row.get(ticker_column))
+        price = row.get(price_column)
+        if index is None or price is None or price != price:
+            return 0
+        return self.on_bar(int(np.datetime64(row[date_column], "ns").astype(np.int64)), index, price)
+
+    def run_live(self, fichier_csv, min_interval=0.01, max_interval=1.0, timeout=None):
+        from csv_follower import CsvFollower
+        follower = CsvFollower(fichier_csv)
+        try:
+            for rows in follower.follow(min_interval=min_interval, max_interval=max_interval, timeout=timeout):
+                for row in rows:
+                    self.on_row(row)
+        except KeyboardInterrupt:
+            pass
+        self.portfolio.finish(liquidate=False)
+        return self.portfolio.summary()
+
+def backtest_portfolio(universe, ema_short_window=5, ema_long_window=23, rsi_window=13, window_signal=13, **portfolio_options):
+    # universe : DataFrame (dates x tickers) ; portfolio_options : paramètres de Portfolio
+    portfolio = Portfolio(universe.columns, **portfolio_options)
+    strategy = MomentumStrategy(len(portfolio.tickers), ema_short_window, ema_long_window, rsi_window, window_signal)
+    engine = EventEngine(strategy, portfolio)
+    summary = engine.run(universe_streams(universe))
+    summary["events_per_s"] = summary["events"] / engine.elapsed if engine.elapsed else np.nan
+    return portfolio, summary
+
+if __name__ == "__main__":
+    from price_store import list_tickers
+    file_path = "../data/resultat_s&p500_trie.xlsx"
+    fichier_csv = "../data/flux_financier.csv"
+    start_date = datetime(2023, 12, 31) - timedelta(days=10 * 365)
+    tickers = None  # None : tous les tickers du store
+    params = (5, 23, 13, 13)
+    cash = 1_000_000.0
+    allocation = 0.02  # 2 % du capital par position
+    cost_bps = 5.0
+    commission = 1.0
+    live = False
+
+    tickers = tickers or list_tickers(workbook=file_path)
+    portfolio = Portfolio(tickers, cash=cash, allocation=allocation, cost_bps=cost_bps, commission=commission)
+    engine = EventEngine(MomentumStrategy(len(tickers), *params), portfolio)
+    if live:
+        summary = engine.run_live(fichier_csv)
+    else:
+        summary = engine.run(store_streams(tickers, start=start_date, workbook=file_path))
+        print(f"{summary['events']} barres en {engine.elapsed:.2f} s ({summary['events'] / engine.elapsed * 60 / 1e6:.2f} M barres/min)")
+    print(portfolio.trades().tail(20).to_string())
+    for key, value in summary.items():
+        print(f"{key:<18} {value:.2f}" if isinstance(value, float) else f"{key:<18} {value}")
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# Stockage colonne par colonne : <store>/<ticker>/<colonne>.npy + manifest.json
+# Les fichiers .npy sont ouverts en memmap, le chargement d'un ticker ne lit que les colonnes demandées.
+DEFAULT_WORKBOOK = "data/resultat_s&p500_trie.xlsx"
+MANIFEST = "manifest.json"
+# Rendements CRSP : codes lettre ('B', 'C'...) pour les valeurs manquantes, lus comme NaN
+RETURN_COLUMNS = ("RET", "RETX")
+_checked_stores = set()
+
+def default_store_dir(workbook=None):
+    # Le store est rangé à côté du classeur Excel dont il provient
+    return os.path.join(os.path.dirname(workbook or DEFAULT_WORKBOOK), "price_store")
+
+def _numeric_text(series, force=False):
+    # Colonne texte avec décimales à virgule : convertie si toutes ses valeurs sont des nombres (ou toujours si force)
+    numeric = pd.to_numeric(series.astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    if force or (series.notna().any() and numeric.notna().sum() >= series.notna().sum()):
+        return numeric
+    return series
+
+def clean_sheet(df):
+    # Nettoyage commun au store et à la lecture directe du classeur : mêmes types dans les deux cas
+    df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    for column in df.columns:
+        if column != "date" and (column in RETURN_COLUMNS or pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column])):
+            df[column] = _numeric_text(df[column], force=column in RETURN_COLUMNS)
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+def _column_array(series):
+    # series : colonne déjà passée par clean_sheet
+    if series.name == "date":
+        return series.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    return series.fillna("").astype(str).to_numpy(dtype=str)
+
+def write_ticker(store_dir, ticker, df):
+    ticker_dir = os.path.join(store_dir, ticker)
+    os.makedirs(ticker_dir, exist_ok=True)
+    columns = {}
+    for column in df.columns:
+        array = _column_array(df[column])
+        np.save(os.path.join(ticker_dir, f"{column}.npy"), array)
+        columns[str(column)] = array.dtype.str
+    # Ordre et types des colonnes, relus par load_arrays
+    with open(os.path.join(ticker_dir, "columns.json"), "w", encoding="utf-8") as f:
+        json.dump(columns, f)
+    return {"rows": len(df), "columns": columns}
+
+def ingest_workbook(workbook=DEFAULT_WORKBOOK, store_dir=None, tickers=None):
+    # Conversion unique du classeur : une feuille à la fois, jamais le classeur entier en mémoire
+    store_dir = store_dir or default_store_dir(workbook)
+    os.makedirs(store_dir, exist_ok=True)
+    # Ingestion partielle (tickers=[...]) : les tickers déjà présents restent dans le manifest
+    # (date de source la plus ancienne conservée : ces tickers-là n'ont pas été relus)
+    manifest = {"source": os.path.abspath(workbook), "source_mtime": os.path.getmtime(workbook), "tickers": {}}
+    if tickers is not None and os.path.isfile(os.path.join(store_dir, MANIFEST)):
+        previous = read_manifest(store_dir)
+        manifest["tickers"] = previous["tickers"]
+        if set(previous["tickers"]) - set(tickers):
+            manifest["source_mtime"] = min(manifest["source_mtime"], previous.get("source_mtime", 0))
+    with pd.ExcelFile(workbook) as xls:
+        sheets = [s for s in xls.sheet_names if tickers is None or s in tickers]
+        for n, ticker in enumerate(sheets, 1):
+            df = pd.read_excel(xls, sheet_name=ticker)
+            if "date" not in df.columns:
+                print(f"Feuille {ticker} ignorée : colonne 'date' absente")
+                continue
+            manifest["tickers"][ticker] = write_ticker(store_dir, ticker, clean_sheet(df))
+            print(f"[{n}/{len(sheets)}] {ticker} : {len(df)} lignes")
+    with open(os.path.join(store_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    _checked_stores.discard(os.path.abspath(store_dir))
+    return store_dir
+
+def read_manifest(store_dir):
+    with open(os.path.join(store_dir, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+def check_store(store_dir, workbook=None):
+    # Avertit (une fois par store) si le classeur source a été modifié après l'ingestion
+    key = os.path.abspath(store_dir)
+    if key in _checked_stores:
+        return True
+    _checked_stores.add(key)
+    if not os.path.isfile(os.path.join(store_dir, MANIFEST)):
+        return True
+    manifest = read_manifest(store_dir)
+    source = workbook or manifest.get("source")
+    if source is None or not os.path.isfile(source) or os.path.getmtime(source) <= manifest.get("source_mtime", 0):
+        return True
+    print(f"Attention : {source} modifié depuis la création du store {store_dir}, "
+          f"relancer l'ingestion (python price_store.py \"{source}\")")
+    return False
+
+def list_tickers(store_dir=None, workbook=None):
+    store_dir = store_dir or default_store_dir(workbook)
+    if os.path.isfile(os.path.join(store_dir, MANIFEST)):
+        check_store(store_dir, workbook)
+        return list(read_manifest(store_dir)["tickers"])
+    with pd.ExcelFile(workbook or DEFAULT_WORKBOOK) as xls:
+        return list(xls.sheet_names)
+
+def _date_slice(dates, start, end):
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+    return slice(lo, hi)
+
+def load_arrays(ticker, start=None, end=None, columns=None, store_dir=None, workbook=None):
+    # Tranches de memmap : aucune copie tant que l'appelant ne modifie pas les tableaux
+    store_dir = store_dir or default_store_dir(workbook)
+    ticker_dir = os.path.join(store_dir, ticker)
+    if not os.path.isdir(ticker_dir):
+        if workbook is None:
+            raise KeyError(f"Ticker '{ticker}' absent du store {store_dir}")
+        df = load_prices(ticker, start, end, columns, store_dir, workbook)
+        return {column: df[column].to_numpy() for column in df.columns}
+    check_store(store_dir, workbook)
+    dates = np.load(os.path.join(ticker_dir, "date.npy"), mmap_mode="r")
+    rows = _date_slice(dates, start, end)
+    if columns is None:
+        with open(os.path.join(ticker_dir, "columns.json"), encoding="utf-8") as f:
+            columns = list(json.load(f))
+    arrays = {"date": dates[rows]}
+    for column in columns:
+        if column != "date":
+            arrays[column] = np.load(os.path.join(ticker_dir, f"{column}.npy"), mmap_mode="r")[rows]
+    return arrays
+
+def load_prices(ticker, start=None, end=None, columns=None, store_dir=None, workbook=None):
+    store_dir = store_dir or default_store_dir(workbook)
+    if os.path.isdir(os.path.join(store_dir, ticker)):
+        return pd.DataFrame(load_arrays(ticker, start, end, columns, store_dir))
+
+    # Pas encore de store : lecture de la feuille Excel avec le même nettoyage
+    df = clean_sheet(pd.read_excel(workbook or DEFAULT_WORKBOOK, sheet_name=ticker))
+    if start is not None:
+        df = df[df["date"] >= start]
+    if end is not None:
+        df = df[df["date"] <= end]
+    if columns is not None:
+        df = df[["date"] + [c for c in columns if c != "date"]]
+    return df.reset_index(drop=True)
+
+def iter_universe(tickers=None, start=None, end=None, columns=None, store_dir=None, workbook=None):
+    # Un ticker à la fois : l'univers complet n'est jamais chargé d'un bloc
+    for ticker in tickers or list_tickers(store_dir, workbook):
+        yield ticker, load_arrays(ticker, start, end, columns, store_dir, workbook)
+
+def load_universe_matrix(tickers=None, start=None, end=None, column="PRC", store_dir=None, workbook=None):
+    # Matrice alignée (dates x tickers) d'une seule colonne, NaN quand un ticker n'a pas de cotation
+    series = {}
+    for ticker, arrays in iter_universe(tickers, start, end, [column], store_dir, workbook):
+        s = pd.Series(np.asarray(arrays[column], dtype=np.float64), index=pd.DatetimeIndex(arrays["date"]))
+        series[ticker] = s[~s.index.duplicated(keep='first')]
+    return pd.DataFrame(series).sort_index()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversion du classeur Excel en store colonne (.npy memmap)")
+    parser.add_argument("workbook", nargs="?", default=DEFAULT_WORKBOOK)
+    parser.add_argument("--store", default=None, help="dossier de sortie (par défaut : <dossier du classeur>/price_store)")
+    parser.add_argument("--tickers", nargs="*", default=None)
+    args = parser.parse_args()
+    if not os.path.isfile(args.workbook):
+        sys.exit(f"Classeur introuvable : {args.workbook}")
+    store = ingest_workbook(args.workbook, args.store, args.tickers)
+    print(f"Store écrit dans {store}")
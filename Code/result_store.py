@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import numpy as np
+
+# Résultats des balayages de paramètres conservés dans une base SQLite :
+# clé (ticker, empreinte des données, version de la stratégie, nombre de barres, paramètres).
+# Les balayages y écrivent par paquets au fil du calcul : une combinaison déjà présente n'est pas recalculée,
+# et un balayage interrompu reprend là où il s'était arrêté. Le classement par PnL est servi par un index.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ticker TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    version TEXT NOT NULL,
+    bars INTEGER NOT NULL,
+    ema_short INTEGER NOT NULL,
+    ema_long INTEGER NOT NULL,
+    rsi_window INTEGER NOT NULL,
+    window_signal INTEGER NOT NULL,
+    pnl REAL NOT NULL,
+    nb_trade INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (ticker, fingerprint, version, bars, ema_short, ema_long, rsi_window, window_signal)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_pnl ON results (ticker, fingerprint, version, bars, pnl DESC);
+-- Dernière série écrite pour un ticker (top sans empreinte)
+CREATE INDEX IF NOT EXISTS results_by_created ON results (ticker, created DESC);
+"""
+
+def data_fingerprint(prices):
+    # Empreinte des prix utilisés par le backtest : toute donnée corrigée ou ajoutée donne une nouvelle clé
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    h = hashlib.sha1(str(len(prices)).encode())
+    h.update(prices.tobytes())
+    return h.hexdigest()[:16]
+
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        # WAL : les lectures (classements) ne bloquent pas les écritures d'un balayage en cours
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def lookup(self, ticker, fingerprint, version, bars):
+        # {(ema_short, ema_long, rsi_window, window_signal): (pnl, nb_trade)} déjà calculés pour cette clé
+        rows = self.connection.execute(
+            "SELECT ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade FROM results "
+            "WHERE ticker = ? AND fingerprint = ? AND version = ? AND bars = ?", (ticker, fingerprint, version, bars))
+        return {row[:4]: row[4:] for row in rows}
+
+    def save(self, ticker, fingerprint, version, bars, results):
+        # results : [(ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade), ...] ; une transaction par paquet
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(ticker, fingerprint, version, bars, int(s), int(l), int(r), int(w), float(pnl), int(nb_trade), now)
+                 for s, l, r, w, pnl, nb_trade in results])
+
+    def top(self, ticker, fingerprint=None, version=None, bars=None, n=20):
+        # Meilleurs PnL ; sans empreinte : dernière série écrite pour ce ticker, sur sa plus longue période
+        if fingerprint is None:
+            latest = self.connection.execute(
+                "SELECT fingerprint, version FROM results WHERE ticker = ? ORDER BY created DESC LIMIT 1", (ticker,)).fetchone()
+            if latest is None:
+                return []
+            fingerprint, version = latest
+        if bars is None:
+            (bars,) = self.connection.execute(
+                "SELECT MAX(bars) FROM results WHERE ticker = ? AND fingerprint = ? AND version = ?", (ticker, fingerprint, version)).fetchone()
+        # À PnL égal : ordre d'énumération, comme sweep (colonnes de la clé primaire, déjà dans l'index)
+        return self.connection.execute(
+            "SELECT ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade FROM results "
+            "WHERE ticker = ? AND fingerprint = ? AND version = ? AND bars = ? "
+            "ORDER BY pnl DESC, ema_short, ema_long, rsi_window, window_signal LIMIT ?",
+            (ticker, fingerprint, version, bars, n)).fetchall()
+
+    def summary(self):
+        return self.connection.execute(
+            "SELECT ticker, fingerprint, version, bars, COUNT(*), MAX(pnl) FROM results GROUP BY ticker, fingerprint, version, bars").fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classement des résultats enregistrés par les balayages")
+    parser.add_argument("database")
+    parser.add_argument("--ticker", default=None, help="sans ticker : contenu de la base")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    if not os.path.isfile(args.database):
+        sys.exit(f"Base introuvable : {args.database}")
+    with ResultStore(args.database) as store:
+        if args.ticker is None:
+            for ticker, fingerprint, version, bars, count, best in store.summary():
+                print(f"{ticker:<10} {fingerprint} {version:<24} {bars:>7} barres {count:>9} combinaisons  meilleur PnL = {best:.2f}")
+        else:
+            for ema_short, ema_long, rsi_window, window_signal, pnl, nb_trade in store.top(args.ticker, n=args.top):
+                print(f"EMA court = {ema_short}, EMA long = {ema_long}, RSI = {rsi_window}, Window Signal = {window_signal}, PnL = {pnl:.2f}, Nombre de trades = {nb_trade}")
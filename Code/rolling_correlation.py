@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Corrélation glissante de N tickers par sommes et produits croisés courants :
+# chaque nouvelle barre coûte O(nombre de paires), sans recalculer toute la fenêtre.
+# Même convention que pandas rolling(window).corr : NaN si la fenêtre contient un NaN pour l'un des deux tickers.
+
+class RollingCorrelation:
+    def __init__(self, tickers, window, pairs="upper", dtype=np.float64):
+        self.tickers = list(tickers)
+        self.window = window
+        self.dtype = dtype
+        n = len(self.tickers)
+        if pairs is None or pairs == "upper":
+            self.i, self.j = np.triu_indices(n, k=1)
+        else:
+            position = {t: k for k, t in enumerate(self.tickers)}
+            pairs = [(position.get(a, a), position.get(b, b)) for a, b in pairs]
+            self.i = np.array([a for a, _ in pairs], dtype=np.intp)
+            self.j = np.array([b for _, b in pairs], dtype=np.intp)
+
+        self.buffer = np.zeros((window, n))
+        self.nan_buffer = np.zeros((window, n), dtype=bool)
+        self.sums = np.zeros(n)
+        self.squares = np.zeros(n)
+        self.cross = np.zeros(len(self.i))
+        self.nan_count = np.zeros(n, dtype=np.int64)
+        self.count = 0
+        self.position = 0
+
+    @property
+    def pair_names(self):
+        return [(self.tickers[a], self.tickers[b]) for a, b in zip(self.i, self.j)]
+
+    def update(self, returns):
+        x = np.asarray(returns, dtype=np.float64)
+        missing = np.isnan(x)
+        x = np.where(missing, 0.0, x)
+
+        # Retrait de la barre qui sort de la fenêtre
+        if self.count >= self.window:
+            old = self.buffer[self.position]
+            self.sums -= old
+            self.squares -= old * old
+            self.cross -= old[self.i] * old[self.j]
+            self.nan_count -= self.nan_buffer[self.position]
+
+        self.sums += x
+        self.squares += x * x
+        self.cross += x[self.i] * x[self.j]
+        self.nan_count += missing
+        self.buffer[self.position] = x
+        self.nan_buffer[self.position] = missing
+        self.count += 1
+        self.position = (self.position + 1) % self.window
+
+        # Sommes recalculées à chaque tour de fenêtre pour borner les erreurs d'arrondi
+        if self.position == 0:
+            self.sums = self.buffer.sum(axis=0)
+            self.squares = (self.buffer * self.buffer).sum(axis=0)
+            self.cross = (self.buffer[:, self.i] * self.buffer[:, self.j]).sum(axis=0)
+        return self.value()
+
+    def value(self):
+        out = np.full(len(self.i), np.nan, dtype=self.dtype)
+        if self.count < self.window:
+            return out
+        n = self.window
+        variance = n * self.squares - self.sums * self.sums
+        covariance = n * self.cross - self.sums[self.i] * self.sums[self.j]
+        denominator = variance[self.i] * variance[self.j]
+        valid = (self.nan_count[self.i] == 0) & (self.nan_count[self.j] == 0) & (denominator > 0)
+        out[valid] = covariance[valid] / np.sqrt(denominator[valid])
+        return out
+
+    def matrix(self):
+        # Matrice symétrique complète (valable si toutes les paires utiles ont été demandées)
+        n = len(self.tickers)
+        corr = np.full((n, n), np.nan, dtype=self.dtype)
+        values = self.value()
+        corr[self.i, self.j] = values
+        corr[self.j, self.i] = values
+        corr[np.arange(n), np.arange(n)] = np.where(self.nan_count == 0, 1, np.nan) if self.count >= self.window else np.nan
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+
+def rolling_correlation(returns, window, pairs="upper", dtype=np.float32):
+    # returns : DataFrame (dates x tickers) ; résultat : une colonne par paire, préallouée en `dtype`
+    engine = RollingCorrelation(returns.columns, window, pairs)
+    values = returns.to_numpy(dtype=np.float64)
+    out = np.empty((len(values), len(engine.i)), dtype=dtype)
+    for t, row in enumerate(values):
+        out[t] = engine.update(row)
+    columns = pd.MultiIndex.from_tuples(engine.pair_names, names=["ticker_1", "ticker_2"])
+    return pd.DataFrame(out, index=returns.index, columns=columns)
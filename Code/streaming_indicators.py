@@ -0,0 +1,210 @@
+import math
+from collections import deque
+
+# Indicateurs incrémentaux pour la boucle temps réel : update(price) -> valeur (None tant que la fenêtre n'est pas pleine)
+# Mémoire fixe (buffers circulaires) et coût constant par tick, mêmes définitions que les versions batch du module indicators.
+
+class RingBuffer:
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.count = 0
+        self.index = 0
+
+    def push(self, value):
+        # Retourne la valeur sortante (None tant que le buffer n'est pas plein)
+        old = self.values[self.index] if self.count >= self.size else None
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+        return old
+
+    def full(self):
+        return self.count >= self.size
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+class SMA:
+    def __init__(self, window):
+        self.window = window
+        self.buffer = RingBuffer(window)
+        self.total = 0.0
+        self.value = None
+
+    def update(self, price):
+        old = self.buffer.push(price)
+        self.total += price - (old or 0.0)
+        # Somme recalculée à chaque tour complet du buffer pour éviter la dérive des arrondis
+        if self.buffer.index == 0:
+            self.total = math.fsum(self.buffer.values)
+        if self.buffer.full():
+            self.value = self.total / self.window
+        return self.value
+
+class EMA:
+    # Initialisée par la SMA des `window` premiers prix, comme dans apply_strategy
+    def __init__(self, window):
+        self.window = window
+        self.multiplier = 2 / (window + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, price):
+        self.count += 1
+        if self.count < self.window:
+            self.total += price
+        elif self.count == self.window:
+            self.value = (self.total + price) / self.window
+        else:
+            self.value = price * self.multiplier + self.value * (1 - self.multiplier)
+        return self.value
+
+class RSI:
+    # method="simple" : moyenne des N derniers écarts (indicators.rsi_series)
+    # method="wilder" : lissage de Wilder, amorcé par la moyenne des N premiers écarts
+    def __init__(self, window, method="simple"):
+        if method not in ("simple", "wilder"):
+            raise ValueError(f"Méthode RSI inconnue : {method}")
+        self.window = window
+        self.method = method
+        self.gains = RingBuffer(window)
+        self.losses = RingBuffer(window)
+        self.gain = 0.0
+        self.loss = 0.0
+        self.nb_gains = 0
+        self.nb_losses = 0
+        self.count = 0
+        self.last_price = None
+        self.value = None
+
+    def update(self, price):
+        self.count += 1
+        if self.last_price is None:
+            self.last_price = price
+            return self.value
+        delta = price - self.last_price
+        self.last_price = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.method == "wilder":
+            n = self.count - 1
+            if n <= self.window:
+                self.gain += gain
+                self.loss += loss
+                if n < self.window:
+                    return self.value
+                self.gain /= self.window
+                self.loss /= self.window
+            else:
+                self.gain = (self.gain * (self.window - 1) + gain) / self.window
+                self.loss = (self.loss * (self.window - 1) + loss) / self.window
+        else:
+            old_gain = self.gains.push(gain) or 0.0
+            old_loss = self.losses.push(loss) or 0.0
+            self.gain += gain - old_gain
+            self.loss += loss - old_loss
+            # Compteurs d'écarts non nuls : une fenêtre sans perte donne exactement 0, pas un résidu d'arrondi
+            self.nb_gains += int(gain > 0) - int(old_gain > 0)
+            self.nb_losses += int(loss > 0) - int(old_loss > 0)
+            if self.gains.index == 0:
+                self.gain = math.fsum(self.gains.values)
+                self.loss = math.fsum(self.losses.values)
+            if self.nb_gains == 0:
+                self.gain = 0.0
+            if self.nb_losses == 0:
+                self.loss = 0.0
+            # Comme indicators.rsi_series : disponible dès N prix (N-1 écarts)
+            if self.count < self.window:
+                return self.value
+
+        # Le ratio gain/perte ne dépend pas du nombre d'écarts, les sommes suffisent
+        if self.loss <= 0:
+            self.value = 100
+        else:
+            self.value = 100 - (100 / (1 + max(self.gain, 0.0) / self.loss))
+        return self.value
+
+class Stochastic:
+    # %K = position du prix dans le range [min, max] des N derniers prix (files monotones)
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.mins = deque()
+        self.maxs = deque()
+        self.value = None
+
+    def update(self, price):
+        i = self.count
+        self.count += 1
+        while self.mins and self.mins[-1][1] >= price:
+            self.mins.pop()
+        self.mins.append((i, price))
+        while self.maxs and self.maxs[-1][1] <= price:
+            self.maxs.pop()
+        self.maxs.append((i, price))
+        if self.mins[0][0] <= i - self.window:
+            self.mins.popleft()
+        if self.maxs[0][0] <= i - self.window:
+            self.maxs.popleft()
+        if self.count < self.window:
+            return self.value
+        lowest, highest = self.mins[0][1], self.maxs[0][1]
+        self.value = (price - lowest) / (highest - lowest) * 100 if highest != lowest else math.nan
+        return self.value
+
+class Bollinger:
+    # (bande basse, SMA, bande haute) avec l'écart-type de population (np.std)
+    def __init__(self, window, k=2):
+        self.window = window
+        self.k = k
+        self.buffer = RingBuffer(window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = None
+
+    def update(self, price):
+        old = self.buffer.push(price)
+        if old is None:
+            # Remplissage : algorithme de Welford
+            n = self.buffer.count
+            delta = price - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (price - self.mean)
+        else:
+            # Fenêtre glissante : on remplace `old` par `price` sans repasser sur le buffer
+            previous_mean = self.mean
+            self.mean += (price - old) / self.window
+            self.m2 += (price - old) * (price - self.mean + old - previous_mean)
+        if self.buffer.index == 0:
+            self.mean = math.fsum(self.buffer.values) / self.window
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.buffer.values)
+        if not self.buffer.full():
+            return self.value
+        std = math.sqrt(max(self.m2 / self.window, 0.0))
+        self.value = (self.mean - self.k * std, self.mean, self.mean + self.k * std)
+        return self.value
+
+class MACD:
+    # (MACD, ligne de signal, histogramme) ; la ligne de signal démarre sur le premier MACD
+    def __init__(self, short_window, long_window, signal_window):
+        self.ema_short = EMA(short_window)
+        self.ema_long = EMA(long_window)
+        self.multiplier = 2 / (signal_window + 1)
+        self.signal = None
+        self.value = None
+
+    def update(self, price):
+        short = self.ema_short.update(price)
+        long = self.ema_long.update(price)
+        if short is None or long is None:
+            return self.value
+        macd = short - long
+        if self.signal is None:
+            self.signal = macd
+        else:
+            self.signal = macd * self.multiplier + self.signal * (1 - self.multiplier)
+        self.value = (macd, self.signal, macd - self.signal)
+        return self.value
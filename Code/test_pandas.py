@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+from market_data import default_provider, fetch_many
 from datetime import datetime, timedelta
 import os 
 
@@ -16,8 +16,10 @@ k = 1 / (4 * np.log(2))
 # DataFrame pour stocker la volatilité de Parkinson
 parkinson_vol_df = pd.DataFrame()
 
-for ticker in tickers:
-    data = yf.download(ticker, start = start_date, end = end_date)
+# Téléchargements en parallèle, avec cache disque (ALGOTRADE_OFFLINE=1 : sans réseau)
+all_data = fetch_many(default_provider(), tickers, start_date, end_date)
+
+for ticker, data in all_data.items():
     # Calcul de la volatilité de Parkinson pour chaque jour
     data['ParkinsonVol'] = np.sqrt(k * (np.log(data['High'] / data['Low']))**2)
     # Ajouter la colonne de volatilité au DataFrame principal
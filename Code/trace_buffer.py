@@ -0,0 +1,89 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+# Enregistrement barre par barre d'un backtest ou d'une session temps réel dans des colonnes typées préallouées :
+# horodatage int64 (ns), colonnes float64 / float32 initialisées à NaN (une valeur absente pendant l'initialisation
+# des indicateurs reste NaN, pas de None ni de dtype objet), capacité doublée quand elle est atteinte.
+# Les signaux (achats, ventes...) sont des événements rares : colonnes compactes (date, prix) par type d'événement.
+
+def to_ns(ts):
+    # pd.Timestamp, datetime, np.datetime64 ou entier déjà en ns
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    value = getattr(ts, "value", None)
+    if isinstance(value, int):
+        return value
+    return int(np.datetime64(ts, "ns").astype(np.int64))
+
+class TraceRecorder:
+    # columns : {nom: dtype}, par exemple {"close": np.float64, "RSI": np.float32}
+    def __init__(self, columns, capacity=1024, events=("buy", "sell")):
+        capacity = max(int(capacity), 1)
+        self.size = 0
+        self.time = np.empty(capacity, dtype=np.int64)
+        self.columns = {name: np.full(capacity, np.nan, dtype=dtype) for name, dtype in columns.items()}
+        self.events = {kind: (array('q'), array('d')) for kind in events}
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self.time))
+        time = np.empty(capacity, dtype=np.int64)
+        time[:self.size] = self.time[:self.size]
+        self.time = time
+        for name, values in self.columns.items():
+            grown = np.full(capacity, np.nan, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def append(self, ts, **values):
+        # Une barre ; colonne absente ou valeur None : NaN
+        k = self.size
+        if k == len(self.time):
+            self._grow(k + 1)
+        self.time[k] = to_ns(ts)
+        for name, value in values.items():
+            if value is not None:
+                self.columns[name][k] = value
+        self.size = k + 1
+
+    def extend(self, ts, **values):
+        # Plusieurs barres d'un coup (colonnes de même longueur que ts)
+        ts = np.asarray(ts)
+        end = self.size + len(ts)
+        if end > len(self.time):
+            self._grow(end)
+        self.time[self.size:end] = ts.astype("datetime64[ns]").view(np.int64) if ts.dtype.kind == "M" else ts
+        for name, column in values.items():
+            self.columns[name][self.size:end] = column
+        self.size = end
+
+    def event(self, kind, ts, value):
+        times, values = self.events[kind]
+        times.append(to_ns(ts))
+        values.append(value)
+
+    def __getitem__(self, name):
+        # Vue sans copie sur les barres enregistrées
+        return self.columns[name][:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def times(self):
+        return self.time[:self.size].view("datetime64[ns]")
+
+    # Copies : une vue (frombuffer) encore référencée empêcherait array.append d'agrandir le tampon (BufferError)
+    def event_times(self, kind):
+        return np.array(self.events[kind][0], dtype=np.int64).view("datetime64[ns]")
+
+    def event_values(self, kind):
+        return np.array(self.events[kind][1], dtype=np.float64)
+
+    def nbytes(self):
+        # Mémoire utilisée par les barres enregistrées et les événements (hors capacité libre)
+        per_bar = self.time.itemsize + sum(values.itemsize for values in self.columns.values())
+        events = sum(times.itemsize * len(times) + values.itemsize * len(values) for times, values in self.events.values())
+        return self.size * per_bar + events
+
+    def to_frame(self):
+        return pd.DataFrame({name: self[name] for name in self.columns}, index=pd.DatetimeIndex(self.times(), name="date"))
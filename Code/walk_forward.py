@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+import Momentum_opti as opti
+
+# Optimisation walk-forward : l'historique est découpé en fenêtres glissantes apprentissage / test,
+# les paramètres retenus sur chaque fenêtre d'apprentissage sont évalués sur la fenêtre de test qui suit.
+# Les indicateurs sont causaux : ils sont calculés une fois par combinaison sur toute la série et chaque pli
+# n'en lit qu'une tranche (les indicateurs d'un pli sont donc déjà initialisés par l'historique qui le précède).
+# Chaque pli démarre sans position ; une position ouverte est clôturée au dernier prix du pli.
+
+def walk_forward_folds(n_bars, train_bars, test_bars, step=None):
+    # Débuts des fenêtres d'apprentissage ; seuls les plis complets sont conservés
+    step = step or test_bars
+    return np.arange(0, n_bars - train_bars - test_bars + 1, step)
+
+def fold_scores(prices, combination, train_starts, train_bars, test_bars, cache=None):
+    # PnL de la combinaison sur toutes les fenêtres d'apprentissage et de test en une passe (une colonne par pli)
+    ema_short, ema_long, rsi_window, window_signal = combination
+    indicators = opti.strategy_indicators(prices, ema_short, ema_long, rsi_window, window_signal, cache)
+    scores = []
+    for starts, length in ((train_starts, train_bars), (train_starts + train_bars, test_bars)):
+        index = starts[None, :] + np.arange(length)[:, None]
+        MACD, signal_line, rsi = (values[index] for values in indicators)
+        position = opti.strategy_positions(MACD, signal_line, rsi, ema_short, ema_long, offset=starts)
+        scores.append(opti.positions_pnl(prices[index], position))
+    (train_pnl, _), (test_pnl, test_trades) = scores
+    return train_pnl, test_pnl, test_trades
+
+def _fold_chunk(combinations, train_starts, train_bars, test_bars):
+    cache = opti._worker_cache
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    results = [fold_scores(opti._shared_prices, combination, train_starts, train_bars, test_bars, cache) for combination in combinations]
+    if cache:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return results, hits, misses
+
+def walk_forward(df, ema_short_range, ema_long_range, rsi_range, window_signal_range, train_bars=252, test_bars=63, step=None,
+                 n_jobs=1, chunk_size=256, cache=True):
+    prices = df["PRC"].to_numpy(dtype=float)
+    dates = pd.to_datetime(df["date"]).to_numpy()
+    train_starts = walk_forward_folds(len(prices), train_bars, test_bars, step)
+    if len(train_starts) == 0:
+        raise ValueError(f"Historique trop court : {len(prices)} barres pour {train_bars} + {test_bars}")
+    combinations = list(opti.iter_combinations(ema_short_range, ema_long_range, rsi_range, window_signal_range))
+    if cache is True:
+        cache = opti.IndicatorCache()
+    elif cache is False:
+        cache = None
+
+    # Boucle combinaisons x plis : chaque indicateur est calculé une fois et sert à tous les plis ;
+    # les paquets de combinaisons sont répartis entre les processus, tous les plis avancent ensemble.
+    if n_jobs != 1:
+        with opti.BacktestPool(prices, n_jobs, chunk_size, cache) as pool:
+            scores = pool.map(_fold_chunk, combinations, train_starts, train_bars, test_bars)
+    else:
+        scores = [fold_scores(prices, combination, train_starts, train_bars, test_bars, cache) for combination in combinations]
+    train_pnl = np.array([s[0] for s in scores])
+    test_pnl = np.array([s[1] for s in scores])
+    test_trades = np.array([s[2] for s in scores])
+
+    # Meilleure combinaison par pli sur l'apprentissage (à égalité : ordre d'énumération, comme grid_search)
+    best = np.argmax(train_pnl, axis=0)
+    folds = np.arange(len(train_starts))
+    test_starts = train_starts + train_bars
+    rows = []
+    for fold, k in zip(folds, best):
+        ema_short, ema_long, rsi_window, window_signal = combinations[k]
+        rows.append({
+            "train_start": dates[train_starts[fold]],
+            "test_start": dates[test_starts[fold]],
+            "test_end": dates[test_starts[fold] + test_bars - 1],
+            "ema_short": ema_short, "ema_long": ema_long, "rsi_window": rsi_window, "window_signal": window_signal,
+            "train_pnl": train_pnl[k, fold],
+            "test_pnl": test_pnl[k, fold],
+            "test_trades": int(test_trades[k, fold]),
+            # Rang du PnL hors échantillon des paramètres retenus parmi toutes les combinaisons (0 % : meilleur possible)
+            "test_rank_pct": (test_pnl[:, fold] > test_pnl[k, fold]).mean() * 100,
+        })
+    results = pd.DataFrame(rows)
+
+    summary = {
+        "folds": len(results),
+        "combinations": len(combinations),
+        "oos_pnl_total": float(results["test_pnl"].sum()),
+        "oos_pnl_mean": float(results["test_pnl"].mean()),
+        "oos_positive_folds_pct": float((results["test_pnl"] > 0).mean() * 100),
+        "oos_trades": int(results["test_trades"].sum()),
+        # Efficacité walk-forward : PnL par barre hors échantillon / PnL par barre en apprentissage
+        "wf_efficiency": float((results["test_pnl"].sum() / test_bars) / (results["train_pnl"].sum() / train_bars)) if results["train_pnl"].sum() else np.nan,
+        "oos_rank_pct_mean": float(results["test_rank_pct"].mean()),
+    }
+    if cache is not None:
+        print(cache.summary())
+    return results, summary
+
+if __name__ == "__main__":
+    file_path = "../data/resultat_s&p500_trie.xlsx"
+    ticker = "AAPL"
+    start_date = datetime(2023, 12, 31) - timedelta(days=10 * 365)
+    ema_short_range = range(5, 20, 1)
+    ema_long_range = range(10, 30, 1)
+    rsi_range = range(10, 25, 1)
+    window_signal_range = range(5, 15, 1)
+    train_bars = 252  # Un an d'apprentissage
+    test_bars = 63  # Un trimestre de test, pas de glissement identique
+    n_jobs = os.cpu_count()
+
+    df = opti.read_excel(file_path, ticker, start_date)
+    results, summary = walk_forward(df, ema_short_range, ema_long_range, rsi_range, window_signal_range, train_bars, test_bars, n_jobs=n_jobs)
+    print(results.to_string())
+    print(f"{summary['folds']} plis : PnL hors échantillon = {summary['oos_pnl_total']:.2f} (moyenne {summary['oos_pnl_mean']:.2f} par pli), "
+          f"{summary['oos_positive_folds_pct']:.0f} % de plis positifs, {summary['oos_trades']} trades, "
+          f"efficacité walk-forward = {summary['wf_efficiency']:.2f}")
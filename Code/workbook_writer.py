@@ -0,0 +1,101 @@
+import os
+import time
+import uuid
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+# Écriture de tous les onglets en une seule passe (openpyxl write_only : mémoire constante)
+# au lieu de réouvrir et réécrire le classeur complet à chaque ticker.
+
+def flatten_columns(columns):
+    # Colonnes multi-niveaux (yfinance : (Price, Ticker)) : on retire les niveaux constants
+    if not isinstance(columns, pd.MultiIndex):
+        return [str(c) for c in columns]
+    levels = [i for i in range(columns.nlevels) if len({str(v) for v in columns.get_level_values(i)} - {""}) > 1] or [0]
+    return [" ".join(str(c[i]) for i in levels if str(c[i])) for c in columns]
+
+def _naive(values):
+    if isinstance(values, pd.DatetimeIndex) and values.tz is not None:
+        return values.tz_localize(None)
+    return values
+
+def dataframe_rows(df, index=True):
+    # Mêmes lignes que DataFrame.to_excel : en-tête puis (index, valeurs), cellules vides pour les NaN
+    header = flatten_columns(df.columns)
+    yield ([df.index.name or ""] + header) if index else header
+    body = df.copy()
+    for column in body.columns:
+        if isinstance(body[column].dtype, pd.DatetimeTZDtype):
+            body[column] = body[column].dt.tz_localize(None)
+    body = body.astype(object).where(body.notna(), None)
+    labels = _naive(df.index).to_list()
+    for label, row in zip(labels, body.itertuples(index=False, name=None)):
+        yield ([label] if index else []) + list(row)
+
+class BulkWorkbookWriter:
+    # with BulkWorkbookWriter(fichier) as writer: writer.write(ticker, df) ...
+    # Les onglets sont écrits au fil de l'eau ; à la fermeture, les onglets existants non réécrits sont recopiés
+    def __init__(self, path, keep_existing=True):
+        self.path = path
+        self.keep_existing = keep_existing
+        self.workbook = Workbook(write_only=True)
+        self.written = []
+
+    def write(self, sheet_name, df, index=True):
+        name = str(sheet_name)[:31]  # Limite Excel sur les noms d'onglets
+        if name in self.written:
+            raise ValueError(f"Onglet '{name}' déjà écrit")
+        sheet = self.workbook.create_sheet(title=name)
+        for row in dataframe_rows(df, index):
+            sheet.append(row)
+        self.written.append(name)
+
+    def close(self):
+        if self.keep_existing and os.path.isfile(self.path):
+            existing = load_workbook(self.path, read_only=True)
+            for name in existing.sheetnames:
+                if name in self.written:
+                    continue
+                sheet = self.workbook.create_sheet(title=name)
+                for row in existing[name].iter_rows(values_only=True):
+                    sheet.append(row)
+            existing.close()
+        if not self.workbook.worksheets:
+            self.workbook.create_sheet(title="Sheet")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Écriture dans un fichier temporaire puis remplacement : jamais de classeur à moitié écrit
+        tmp_path = self.path + ".tmp"
+        self.workbook.save(tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Les onglets déjà téléchargés sont sauvegardés même si la boucle a été interrompue
+        self.close()
+        return False
+
+class ParquetDatasetWriter:
+    # Jeu de données Parquet partitionné par ticker : <dossier>/ticker=<T>/part-*.parquet
+    # Chaque ajout crée un nouveau fichier, les données déjà écrites ne sont jamais réécrites.
+    def __init__(self, root):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("La sortie Parquet nécessite pyarrow (pip install pyarrow)") from e
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def write(self, ticker, df, index=True):
+        partition = os.path.join(self.root, f"ticker={ticker}")
+        os.makedirs(partition, exist_ok=True)
+        df = df.copy()
+        df.columns = flatten_columns(df.columns)
+        path = os.path.join(partition, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        df.to_parquet(path, index=index)
+        return path
+
+def read_parquet_dataset(root, tickers=None):
+    filters = [("ticker", "in", list(tickers))] if tickers is not None else None
+    return pd.read_parquet(root, filters=filters)